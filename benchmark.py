@@ -0,0 +1,268 @@
+"""
+Замеры производительности: шаги физики, кадры отрисовки, пакетные прогоны,
+экспорт роликов, холодный запуск.
+
+Результаты пишутся в JSON и сравниваются с сохранённым эталоном; просадка
+больше допуска считается регрессией (код возврата 1).
+
+    python benchmark.py --output bench.json --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Отрисовка без окна: драйвер нужно выбрать до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from simulation import DT, Engagement, make_rng, run_engagement  # noqa: E402
+
+# Фиксированный набор сценариев: (дрон км/ч, ракета км/ч, зона км)
+SCENARIOS = [
+    (80.0, 120.0, 3.0),
+    (20.0, 300.0, 8.0),
+    (150.0, 100.0, 5.0),
+    (50.0, 400.0, 2.0),
+]
+MASTER_SEED = 2024
+MAX_TIME = 3600.0  # сек; ограничивает редкие очень долгие прогоны
+
+
+def best_of(repeat, func):
+    """Лучшее время из repeat запусков func()"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_physics_steps(steps, repeat):
+    """Шаги физики Engagement.step в секунду (без отрисовки)"""
+    def run():
+        run_index = 0
+        engagement = None
+        for _ in range(steps):
+            if engagement is None or engagement.finished:
+                engagement = Engagement(*SCENARIOS[run_index % len(SCENARIOS)],
+                                        make_rng(MASTER_SEED, run_index))
+                engagement.launch()
+                run_index += 1
+            engagement.step(DT)
+
+    return steps / best_of(repeat, run)
+
+
+def bench_render(frames, repeat, render_mode):
+    """Кадры draw_simulation_screen в секунду на невидимой поверхности"""
+    import main
+
+    app = main.SimulationApp(render_mode=render_mode)
+    app.state = main.STATE_RUNNING
+    app.master_seed = MASTER_SEED
+
+    best = float("inf")
+    for _ in range(repeat):
+        app.run_index = 1
+        app.reset_simulation()
+        app.engagement.launch()
+        app.save_previous_state()
+        draw_time = 0.0
+        for _ in range(frames):
+            if app.simulation_finished:
+                app.reset_simulation()
+                app.engagement.launch()
+                app.save_previous_state()
+            app.step_physics()
+            start = time.perf_counter()
+            app.draw_simulation_screen()
+            draw_time += time.perf_counter() - start
+        best = min(best, draw_time)
+
+    return frames / best
+
+
+# Большая карта: массированная атака, окно — участок 16×12 км у края карты
+LARGE_MAP_KM = (400.0, 300.0)
+LARGE_MAP_SWARM = (3000, 300)  # ракет, дронов
+
+
+def bench_render_large_map(frames, repeat):
+    """Кадры экрана массированной атаки в секунду при увеличении на большой карте"""
+    import main
+
+    app = main.SimulationApp(swarm=LARGE_MAP_SWARM, map_km=LARGE_MAP_KM)
+    app.speed_drone_kmh, app.speed_missile_kmh, app.zone_radius_km = SCENARIOS[1]
+    app.master_seed, app.run_index = MASTER_SEED, 1
+    app.start_swarm()
+    app.step_physics()
+    app.camera.scale = main.SCALE
+    app.camera.center_on(LARGE_MAP_KM[0] / 2, 6.0)
+
+    def run():
+        for _ in range(frames):
+            app.draw_simulation_screen()
+
+    return frames / best_of(repeat, run)
+
+
+def bench_export(frames, repeat):
+    """
+    Кадры ролика GIF в секунду (export.py): отрисовка и фоновое кодирование
+    вместе, до записи файла
+    """
+    import tempfile
+
+    import export
+    import main
+
+    app = main.SimulationApp()
+    app.speed_drone_kmh, app.speed_missile_kmh, app.zone_radius_km = SCENARIOS[1]
+    app.master_seed = MASTER_SEED
+    size = main.get_screen().get_size()
+    written = []
+
+    def run():
+        app.run_index = 1
+        app.state = main.STATE_RUNNING
+        app.reset_simulation()
+        app.engagement.launch()
+        app.save_previous_state()
+        with tempfile.TemporaryDirectory() as tmp:
+            encoder = export.GifEncoder(os.path.join(tmp, "bench.gif"), size)
+            count = 0
+            for count, frame in zip(range(1, frames + 1), export.render_frames(app, 10)):
+                encoder.write(frame)
+            encoder.finish()
+            encoder.wait()
+        written.append(count)  # взаимодействие может закончиться раньше
+
+    best = best_of(repeat, run)
+    return written[-1] / best
+
+
+# Холодный запуск в новом интерпретаторе: импорт main и первый кадр экрана настройки
+COLD_IMPORT = "import main"
+COLD_FIRST_FRAME = "import main; main.SimulationApp().draw_setup_screen()"
+
+
+def bench_cold_start(code, repeat):
+    """Запусков нового интерпретатора с code в секунду (без учёта пустого запуска)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def run(source):
+        subprocess.run([sys.executable, "-c", source], cwd=here, env=os.environ, check=True)
+
+    empty = best_of(repeat, lambda: run("pass"))
+    return 1.0 / max(best_of(repeat, lambda: run(code)) - empty, 1e-6)
+
+
+def bench_engagements(runs, repeat, integrator):
+    """Полных прогонов без окна в секунду на фиксированном наборе сценариев"""
+    def run():
+        for run_index in range(runs):
+            run_engagement(*SCENARIOS[run_index % len(SCENARIOS)],
+                           make_rng(MASTER_SEED, run_index),
+                           max_time=MAX_TIME, integrator=integrator)
+
+    return runs / best_of(repeat, run)
+
+
+def bench_batch(trials, repeat):
+    """Взаимодействий в секунду в пакетном движке NumPy"""
+    import numpy as np
+
+    from batch import run_batch
+
+    def run():
+        for i, params in enumerate(SCENARIOS):
+            run_batch(trials, *params, rng=np.random.default_rng([MASTER_SEED, i]),
+                      max_time=MAX_TIME)
+
+    return trials * len(SCENARIOS) / best_of(repeat, run)
+
+
+def run_benchmarks(quick=False, repeat=3):
+    """Все замеры; значения — операций в секунду (больше — лучше)"""
+    scale = 0.1 if quick else 1.0
+    results = {
+        "physics_steps_per_sec": bench_physics_steps(int(200_000 * scale), repeat),
+        "render_full_fps": bench_render(int(2_000 * scale), repeat, "full"),
+        "render_cached_fps": bench_render(int(2_000 * scale), repeat, "cached"),
+        "render_large_map_fps": bench_render_large_map(int(1_000 * scale), repeat),
+        "export_gif_fps": bench_export(max(int(300 * scale), 60), repeat),
+        "engagements_fixed_per_sec": bench_engagements(max(int(80 * scale), 12), repeat, "fixed"),
+        "engagements_event_per_sec": bench_engagements(max(int(80 * scale), 12), repeat, "event"),
+        "engagements_predict_per_sec": bench_engagements(max(int(80 * scale), 12), repeat, "predict"),
+        "cold_import_per_sec": bench_cold_start(COLD_IMPORT, max(repeat, 5)),
+        "cold_first_frame_per_sec": bench_cold_start(COLD_FIRST_FRAME, max(repeat, 5)),
+    }
+    try:
+        results["batch_engagements_per_sec"] = bench_batch(int(2_000 * scale), repeat)
+    except ImportError:
+        pass  # NumPy не установлен — пакетный замер пропускается
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Список регрессий (имя, текущее, эталон) с просадкой больше tolerance"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        value = results.get(name)
+        if value is not None and value < base * (1.0 - tolerance):
+            regressions.append((name, value, base))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности симуляции")
+    parser.add_argument("--output", default="bench.json", help="файл с результатами")
+    parser.add_argument("--baseline", help="эталон для сравнения")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                        help="сохранить результаты как новый эталон")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="допустимая просадка относительно эталона (доля)")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер")
+    parser.add_argument("--quick", action="store_true", help="короткие замеры")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": run_benchmarks(args.quick, args.repeat),
+    }
+
+    for name, value in report["results"].items():
+        print(f"{name:32s} {value:14.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report["results"], baseline, args.tolerance)
+        for name, value, base in regressions:
+            print(f"РЕГРЕССИЯ {name}: {value:.1f} против эталона {base:.1f} "
+                  f"({(1 - value / base) * 100:.0f}% медленнее)")
+        if regressions:
+            return 1
+        print("Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Камера карты: перевод км ↔ пиксели с панорамированием и масштабом,
+проверки видимости для отсечения объектов до отрисовки.
+
+Мир в км с началом в левом НИЖНЕМ углу, экран в пикселях с началом
+в левом верхнем — ось Y переворачивается. Камера задаётся левым верхним
+углом вида в км (left, top) и масштабом scale в пикселях на км. Модуль
+не зависит от pygame.
+"""
+import math
+
+MIN_SCALE = 0.5      # пикселей на км: около 1400 км на ширину окна
+MAX_SCALE = 2000.0   # пикселей на км: около 360 м на ширину окна
+ZOOM_STEP = 1.25     # во сколько раз меняется масштаб за щелчок колеса
+
+
+class Camera:
+    """Вид на карту размером width_px × height_px пикселей"""
+
+    def __init__(self, width_px, height_px, left_km=0.0, top_km=0.0, scale=1.0):
+        self.width_px = width_px
+        self.height_px = height_px
+        self.left = left_km
+        self.top = top_km
+        self.scale = scale
+
+    @classmethod
+    def fit(cls, width_px, height_px, width_km, height_km):
+        """Камера, показывающая карту width_km × height_km целиком и по центру"""
+        camera = cls(width_px, height_px)
+        camera.fit_world(width_km, height_km)
+        return camera
+
+    def fit_world(self, width_km, height_km):
+        self.scale = min(self.width_px / width_km, self.height_px / height_km)
+        self.center_on(width_km / 2, height_km / 2)
+
+    @property
+    def key(self):
+        """Меняется при любом сдвиге или масштабировании (для кэшей отрисовки)"""
+        return self.left, self.top, self.scale
+
+    @property
+    def center(self):
+        return (self.left + self.width_px / 2 / self.scale,
+                self.top - self.height_px / 2 / self.scale)
+
+    def center_on(self, x_km, y_km):
+        self.left = x_km - self.width_px / 2 / self.scale
+        self.top = y_km + self.height_px / 2 / self.scale
+
+    def to_px(self, x_km, y_km):
+        """Точка мира → пиксели экрана"""
+        return int((x_km - self.left) * self.scale), int((self.top - y_km) * self.scale)
+
+    def to_km(self, x_px, y_px):
+        """Пиксели экрана → точка мира"""
+        return self.left + x_px / self.scale, self.top - y_px / self.scale
+
+    def length_px(self, km):
+        return int(km * self.scale)
+
+    def pan(self, dx_px, dy_px):
+        """Сдвиг вида на (dx_px, dy_px) пикселей экрана (перетаскивание карты)"""
+        self.left -= dx_px / self.scale
+        self.top += dy_px / self.scale
+
+    def zoom(self, factor, x_px=None, y_px=None):
+        """
+        Масштаб × factor в пределах MIN_SCALE…MAX_SCALE; точка экрана
+        (x_px, y_px) (по умолчанию центр) остаётся на месте.
+        """
+        if x_px is None:
+            x_px, y_px = self.width_px / 2, self.height_px / 2
+        x_km, y_km = self.to_km(x_px, y_px)
+        self.scale = min(max(self.scale * factor, MIN_SCALE), MAX_SCALE)
+        self.left = x_km - x_px / self.scale
+        self.top = y_km + y_px / self.scale
+
+    def view_km(self, margin_px=0):
+        """Видимая область мира (x0, y0, x1, y1) с запасом margin_px пикселей"""
+        margin = margin_px / self.scale
+        return (self.left - margin, self.top - self.height_px / self.scale - margin,
+                self.left + self.width_px / self.scale + margin, self.top + margin)
+
+    def visible(self, x_km, y_km, radius_km=0.0, margin_px=0):
+        """Пересекает ли вид квадрат со стороной 2·radius_km вокруг точки"""
+        x0, y0, x1, y1 = self.view_km(margin_px)
+        return (x0 - radius_km <= x_km <= x1 + radius_km and
+                y0 - radius_km <= y_km <= y1 + radius_km)
+
+    def ring_visible(self, x_km, y_km, radius_km, margin_px=0):
+        """
+        Видна ли окружность (контур): она не целиком вне вида
+        и вид не целиком внутри неё.
+        """
+        x0, y0, x1, y1 = self.view_km(margin_px)
+        # Ближайшая к центру точка вида — дальше радиуса: окружность снаружи
+        nx = min(max(x_km, x0), x1)
+        ny = min(max(y_km, y0), y1)
+        r2 = radius_km * radius_km
+        if (nx - x_km) ** 2 + (ny - y_km) ** 2 > r2:
+            return False
+        # Самый дальний угол вида ближе радиуса: вид внутри круга, контура не видно
+        fx = max(abs(x0 - x_km), abs(x1 - x_km))
+        fy = max(abs(y0 - y_km), abs(y1 - y_km))
+        return fx * fx + fy * fy >= r2
+
+    def arc_points(self, x_km, y_km, radius_km, tolerance_px=0.5, max_points=512):
+        """
+        Точки экрана на видимой дуге окружности, центр которой вне вида,
+        с отклонением ломаной от дуги не больше tolerance_px. Число точек
+        не зависит от радиуса, поэтому огромные окружности при сильном
+        увеличении рисуются так же быстро, как маленькие.
+        """
+        x0, y0, x1, y1 = self.view_km()
+        # Угловой размер вида, как он виден из центра окружности
+        base = math.atan2((y0 + y1) / 2 - y_km, (x0 + x1) / 2 - x_km)
+        offsets = [(math.atan2(cy - y_km, cx - x_km) - base + math.pi) % (2 * math.pi) - math.pi
+                   for cx in (x0, x1) for cy in (y0, y1)]
+        start, end = base + min(offsets), base + max(offsets)
+
+        radius_px = radius_km * self.scale
+        step = 2 * math.acos(max(1.0 - tolerance_px / radius_px, -1.0))
+        n = min(max(int((end - start) / step) + 1, 2), max_points)
+        return [self.to_px(x_km + radius_km * math.cos(a), y_km + radius_km * math.sin(a))
+                for a in (start + (end - start) * i / n for i in range(n + 1))]
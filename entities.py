@@ -0,0 +1,154 @@
+"""
+Сущности взаимодействия: дрон, ракета, взрыв — и хранилище снапшотов.
+
+Классы со __slots__: у объекта нет __dict__, набор полей фиксирован,
+копия — несколько присваиваний. Скорости и радиус зоны — параметры
+взаимодействия, они лежат в simulation.Engagement, а не здесь: в сущностях
+только то, что меняется по ходу прогона.
+
+StateStore хранит много состояний взаимодействия столбцами array (по
+столбцу на поле STATE_FIELDS), STATE_BYTES байт на состояние без накладных
+расходов на объекты, — для переборов и просмотра, где снапшотов миллионы.
+"""
+from array import array
+
+
+class Drone:
+    """Дрон: позиция и скорость в км и км/сек, пройденный путь в км"""
+    __slots__ = ("x", "y", "vx", "vy", "distance")
+
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+        self.vx = 0.0  # скорость на последнем шаге (для наведения)
+        self.vy = 0.0
+        self.distance = 0.0
+
+    def copy(self):
+        other = Drone.__new__(Drone)
+        other.x, other.y, other.vx, other.vy, other.distance = (
+            self.x, self.y, self.vx, self.vy, self.distance)
+        return other
+
+
+class Missile:
+    """
+    Ракета: позиция в км, курс в радианах, таймер до смены курса
+    (turn_timer растёт до turn_interval), пройденный путь в км.
+    """
+    __slots__ = ("x", "y", "angle", "active", "turn_timer", "turn_interval", "distance")
+
+    def __init__(self, turn_interval=0.0):
+        self.x = 0.0
+        self.y = 0.0
+        self.angle = 0.0
+        self.active = False
+        self.turn_timer = 0.0
+        self.turn_interval = turn_interval
+        self.distance = 0.0
+
+    def copy(self):
+        other = Missile.__new__(Missile)
+        (other.x, other.y, other.angle, other.active, other.turn_timer,
+         other.turn_interval, other.distance) = (
+            self.x, self.y, self.angle, self.active, self.turn_timer,
+            self.turn_interval, self.distance)
+        return other
+
+
+class Explosion:
+    """Анимация взрыва при перехвате: идёт duration секунд после start()"""
+    __slots__ = ("active", "time", "duration")
+
+    def __init__(self, duration=1.0):
+        self.active = False
+        self.time = 0.0
+        self.duration = duration
+
+    def start(self):
+        self.active = True
+        self.time = 0.0
+
+    def finish(self):
+        """Сразу в конечный кадр (например, при перемотке записи)"""
+        self.active = True
+        self.time = self.duration
+
+    def reset(self):
+        self.active = False
+        self.time = 0.0
+
+    def update(self, dt):
+        """Продвигает анимацию; True, когда она закончилась"""
+        self.time += dt
+        return self.time >= self.duration
+
+    @property
+    def progress(self):
+        """Доля прошедшей анимации, 0…1"""
+        return min(1.0, self.time / self.duration)
+
+
+# Поля снапшота взаимодействия и коды типов столбцов array
+# ("d" — float64, чтобы восстановление было бит в бит; флаги — битовая маска)
+STATE_FIELDS = (
+    ("time_elapsed", "d"), ("steps", "q"),
+    ("drone_x", "d"), ("drone_y", "d"), ("drone_vx", "d"), ("drone_vy", "d"),
+    ("drone_distance", "d"),
+    ("missile_x", "d"), ("missile_y", "d"), ("missile_angle", "d"),
+    ("turn_timer", "d"), ("turn_interval", "d"), ("missile_distance", "d"),
+    ("flags", "B"),
+)
+STATE_BYTES = sum(array(code).itemsize for _, code in STATE_FIELDS)
+
+# Биты поля flags
+FLAG_MISSILE_ACTIVE = 1
+FLAG_INTERCEPTED = 2
+FLAG_FINISHED = 4
+FLAG_SEGMENT_PREDICTED = 8
+
+
+class StateStore:
+    """
+    Снапшоты взаимодействий столбцами array: append() добавляет кортеж
+    Engagement.snapshot() или само взаимодействие, store[i] возвращает
+    снапшот для Engagement.restore(). Поток случайных чисел в снапшот не
+    входит (он в сотни раз больше остального состояния): восстановленное
+    взаимодействие годится для просмотра и анализа, а продолжать прогон
+    бит в бит нужно с Engagement.clone().
+    """
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in STATE_FIELDS}
+        self._arrays = tuple(self.columns.values())
+
+    def __len__(self):
+        return len(self._arrays[0])
+
+    @property
+    def nbytes(self):
+        """Объём данных в байтах (без запаса, который array держит на рост)"""
+        return len(self) * STATE_BYTES
+
+    def append(self, state):
+        if not isinstance(state, tuple):
+            state = state.snapshot()
+        for column, value in zip(self._arrays, state):
+            column.append(value)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return tuple(column[index] for column in self._arrays)
+
+    def column(self, name):
+        """Столбец как массив NumPy без копирования; пока он жив, append() недоступен"""
+        import numpy as np
+
+        return np.frombuffer(self.columns[name], dtype=self.columns[name].typecode)
+
+    def clear(self):
+        for column in self._arrays:
+            del column[:]
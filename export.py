@@ -0,0 +1,433 @@
+"""
+Экспорт взаимодействий в GIF и MP4 без окна.
+
+Кадры рисует тот же SimulationApp.draw_simulation_screen, что и в GUI,
+но с драйвером SDL dummy: окно — поверхность в памяти, и кадры идут
+подряд, без ожидания частоты кадров, — много быстрее реального времени.
+Кодирование идёт в фоне параллельно отрисовке: GIF квантует и по кадру
+дописывает отдельный процесс (Pillow, одна палитра на ролик), MP4 —
+процесс ffmpeg, которому кадры передаёт поток. Память не зависит от
+длины ролика.
+
+Источники — записи траекторий (trajectory.py, main.py --record) и файлы
+JSON Lines из replay.py search: каждая запись прогона в них — отдельный
+ролик. Прогон повторяется по зерну тем же интегратором, что в записи,
+и сверяется с ней (replay.replay), а кадры строятся по его снапшотам.
+Ускорение по умолчанию подбирается так, чтобы ролик длился не дольше
+--clip-seconds.
+
+    python replay.py search --params 20 300 8 --seed 1 --runs 1000 \\
+                            --intercepted --output interesting.jsonl
+    python export.py interesting.jsonl run.traj --format mp4 --output-dir clips
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+FPS = 30             # кадров в секунду ролика
+CLIP_SECONDS = 20.0  # предел длины ролика при автоматическом ускорении
+HOLD_SECONDS = 1.0   # сколько держать последний кадр
+QUEUE_FRAMES = 32    # кадров в очереди к кодировщику
+PALETTE_STRIP = 16   # высота полосы дополнительных цветов при построении палитры GIF
+
+
+def clip_speed(duration, speed=None, clip_seconds=CLIP_SECONDS):
+    """Ускорение ролика: заданное или наименьшее целое, при котором он не длиннее clip_seconds"""
+    if speed is not None:
+        return speed
+    return max(1, math.ceil(duration / clip_seconds))
+
+
+def _gif_palette(image, colors):
+    """
+    Палитра ролика: первый кадр и полоса цветов colors, которых в нём
+    может не быть (взрыв), квантованные до 256 цветов
+    """
+    from PIL import Image
+
+    width, height = image.size
+    sample = Image.new("RGB", (width, height + PALETTE_STRIP))
+    sample.paste(image)
+    band = width // max(len(colors), 1)
+    for i, color in enumerate(colors):
+        sample.paste(color, (i * band, height, (i + 1) * band, height + PALETTE_STRIP))
+    return sample.quantize(method=Image.Quantize.FASTOCTREE)
+
+
+def _gif_worker(frames, path, size, fps, colors):
+    """
+    Процесс-кодировщик GIF: квантует кадры по мере поступления и сразу
+    дописывает их в файл, в памяти — только предыдущий кадр. Палитра
+    общая (глобальная таблица GIF), поэтому квантование сводится к поиску
+    ближайшего цвета; кадр пишется обрезанным до области, изменившейся
+    с предыдущего, а одинаковые кадры сливаются в один более долгий.
+    Задержки в GIF — целые сотые секунды; они округляются по общему
+    времени ролика, так что средняя частота кадров точна.
+    """
+    from PIL import GifImagePlugin, Image, ImageChops
+
+    frame_ms = 1000 / fps
+    with open(path, "wb") as f:
+        palette = previous = None
+        pending = None  # [кадр, смещение, длительность мс] — ждёт, не повторится ли он
+        written_ms = 0.0  # длительность уже записанных кадров
+
+        def flush():
+            nonlocal written_ms
+            image, offset, duration = pending
+            end = written_ms + duration
+            centis = round(end / 10) - round(written_ms / 10)
+            written_ms = end
+            f.write(b"".join(GifImagePlugin.getdata(image, offset, duration=centis * 10)))
+
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            image = Image.frombytes("RGB", size, frame)
+            if previous is None:
+                palette = _gif_palette(image, colors)
+                bbox = (0, 0) + size
+            else:
+                bbox = ImageChops.difference(previous, image).getbbox()
+            previous = image
+            if bbox is None:
+                pending[2] += frame_ms
+                continue
+
+            quantized = image.crop(bbox).quantize(palette=palette, dither=Image.Dither.NONE)
+            if pending is None:
+                header, _ = GifImagePlugin.getheader(quantized, info={"loop": 0})
+                f.write(b"".join(header))
+            else:
+                flush()
+            pending = [quantized, bbox[:2], frame_ms]
+        if pending is not None:
+            flush()
+        f.write(b";")  # конец файла GIF
+
+
+class GifEncoder:
+    """GIF через Pillow в отдельном процессе"""
+
+    def __init__(self, path, size, fps=FPS):
+        from main import EXPLOSION_COLORS
+
+        self.path = path
+        # spawn: не копировать в дочерний процесс состояние SDL
+        context = multiprocessing.get_context("spawn")
+        self.frames = context.Queue(QUEUE_FRAMES)
+        self.process = context.Process(target=_gif_worker,
+                                       args=(self.frames, path, size, fps, EXPLOSION_COLORS),
+                                       daemon=True)
+        self.process.start()
+
+    def write(self, frame):
+        while True:
+            try:
+                self.frames.put(frame, timeout=1.0)
+                return
+            except queue.Full:
+                if not self.process.is_alive():
+                    raise RuntimeError(f"{self.path}: кодировщик GIF завершился с ошибкой")
+
+    def finish(self):
+        """Кадров больше не будет; файл дописывается в фоне"""
+        self.write(None)
+
+    def wait(self):
+        self.process.join()
+        if self.process.exitcode != 0:
+            raise RuntimeError(f"{self.path}: кодировщик GIF завершился с кодом "
+                               f"{self.process.exitcode}")
+
+
+class Mp4Encoder:
+    """MP4 (H.264) через ffmpeg; кадры передаёт ему фоновый поток"""
+
+    def __init__(self, path, size, fps=FPS):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("для MP4 нужен ffmpeg в PATH (или --format gif)")
+        self.path = path
+        self.process = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}",
+             "-r", str(fps), "-i", "-",
+             "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart", path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.frames = queue.Queue(QUEUE_FRAMES)
+        self.error = None
+        self.thread = threading.Thread(target=self._feed, daemon=True)
+        self.thread.start()
+
+    def _feed(self):
+        stdin = self.process.stdin
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            if self.error is None:
+                try:
+                    stdin.write(frame)
+                except OSError as e:  # ffmpeg завершился; очередь дочитывается до конца
+                    self.error = e
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+    def write(self, frame):
+        self.frames.put(frame)
+
+    def finish(self):
+        """Кадров больше не будет; ffmpeg дописывает файл в фоне"""
+        self.frames.put(None)
+
+    def wait(self):
+        self.thread.join()
+        stderr = self.process.stderr.read().decode(errors="replace").strip()
+        if self.process.wait() != 0 or self.error is not None:
+            raise RuntimeError(f"{self.path}: ffmpeg: {stderr or self.error}")
+
+
+ENCODERS = {"gif": GifEncoder, "mp4": Mp4Encoder}
+
+
+def _screen_bytes():
+    import main
+
+    return main.pygame.image.tobytes(main.get_screen(), "RGB")
+
+
+def render_frames(app, speed, fps=FPS, hold=HOLD_SECONDS):
+    """
+    Кадры ролика (байты RGB экрана) для приложения, подготовленного к
+    прогону (STATE_RUNNING) или просмотру записи (STATE_PLAYBACK): каждый
+    кадр продвигает взаимодействие на speed / fps симулируемых секунд.
+    """
+    import main
+
+    app.time_scale = speed
+    frame_time = 1.0 / fps
+    while True:
+        if app.state == main.STATE_PLAYBACK:
+            app.update_playback(frame_time)
+        else:
+            app.update_simulation(frame_time)
+        frame = _screen_bytes()
+        yield frame
+        if app.simulation_finished:
+            break
+    for _ in range(round(hold * fps)):
+        yield frame
+
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def render_states(app, states, speed, fps=FPS, hold=HOLD_SECONDS):
+    """
+    Кадры ролика по снапшотам прогона states (entities.StateStore) с
+    любым интегратором: состояние на момент кадра — снапшот перед ним,
+    позиции и пути линейно интерполированы к следующему (при прыжках
+    событийного шага ракета летит прямо, а дрон стоит — интерполяция
+    точна). После перехвата — анимация взрыва, как в GUI.
+    """
+    from bisect import bisect_right
+
+    sim = app.engagement
+    times = states.column("time_elapsed").tolist()
+    app.time_scale = speed
+    app.simulation_paused = False
+    app.simulation_finished = False
+    step = speed / fps
+    t = 0.0
+    while True:
+        i = max(bisect_right(times, t) - 1, 0)
+        sim.restore(states[i])
+        if i + 1 < len(times):
+            nxt = states[i + 1]
+            a = (t - times[i]) / (times[i + 1] - times[i])
+            d, m = sim.drone, sim.missile
+            # Поля снапшота: 2–3 — дрон, 6 — его путь, 7–8 — ракета, 12 — её путь
+            d.x, d.y = _lerp(d.x, nxt[2], a), _lerp(d.y, nxt[3], a)
+            d.distance = _lerp(d.distance, nxt[6], a)
+            m.x, m.y = _lerp(m.x, nxt[7], a), _lerp(m.y, nxt[8], a)
+            m.distance = _lerp(m.distance, nxt[12], a)
+            sim.time_elapsed = t
+        app.save_previous_state()
+        app.accumulator = 0.0
+        app.draw_simulation_screen()
+        yield _screen_bytes()
+        if t >= times[-1]:
+            break
+        t = min(t + step, times[-1])
+
+    if sim.intercepted:
+        app.explosion.start()
+        while not app.explosion.update(step):
+            app.draw_simulation_screen()
+            yield _screen_bytes()
+    app.simulation_finished = app.simulation_paused = True
+    app.draw_simulation_screen()
+    frame = _screen_bytes()
+    for _ in range(max(round(hold * fps), 1)):
+        yield frame
+
+
+def prepare_record(app, record):
+    """
+    Повторяет запись replay.ReplayRecord её интегратором со снапшотами
+    (replay.ReplayMismatch, если прогон разошёлся с записью) и готовит
+    приложение к показу; возвращает entities.StateStore
+    """
+    import main
+    from entities import StateStore
+    from replay import replay
+
+    params = record.params
+    app.speed_drone_kmh = params["speed_drone_kmh"]
+    app.speed_missile_kmh = params["speed_missile_kmh"]
+    app.zone_radius_km = params["zone_radius_km"]
+    app.guidance = params.get("guidance", "random")
+    app.evasion = params.get("evasion", "flee")
+    app.physics_dt = params["dt"]
+    app.master_seed, app.run_index = record.master_seed, record.run_index
+    app.state = main.STATE_RUNNING
+    app.reset_simulation()
+    states = StateStore()
+    app.engagement = replay(record, states)
+    return states
+
+
+def prepare_trajectory(app, path):
+    """Открывает запись траектории для просмотра; возвращает её длительность, сек"""
+    app.open_playback(path)
+    app.simulation_paused = False
+    return app.playback.row(len(app.playback) - 1)["time"]
+
+
+def clip_sources(paths):
+    """(имя ролика, запись прогона или None, путь) для каждого ролика из файлов paths"""
+    from replay import load_records
+
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if path.endswith(".jsonl"):
+            for record in load_records(path):
+                yield f"{stem}_{record.master_seed}_{record.run_index}", record, path
+        else:
+            yield stem, None, path
+
+
+def export_clips(paths, output_dir=".", fmt="gif", fps=FPS, speed=None,
+                 clip_seconds=CLIP_SECONDS, hold=HOLD_SECONDS, use_sprites=True,
+                 progress=None):
+    """
+    Экспортирует все ролики из paths в output_dir одним приложением.
+    Пока кодировщик дописывает ролик, рисуется следующий.
+    progress(path, frames, seconds) вызывается, когда ролик записан
+    (seconds — время отрисовки, включая ожидание очереди кодировщика).
+    Возвращает пути роликов.
+    """
+    import main
+
+    os.makedirs(output_dir, exist_ok=True)
+    app = main.SimulationApp(use_sprites=use_sprites)
+    size = main.get_screen().get_size()
+    outputs = []
+    pending = None  # (кодировщик, путь, кадров, секунд) ролика, который ещё дописывается
+
+    def wait(job):
+        encoder, path, frames, seconds = job
+        encoder.wait()
+        outputs.append(path)
+        if progress is not None:
+            progress(path, frames, seconds)
+
+    try:
+        for name, record, source in clip_sources(paths):
+            start = time.perf_counter()
+            if record is not None:
+                states = prepare_record(app, record)
+                clip = render_states(app, states, clip_speed(record.result.time, speed,
+                                                             clip_seconds), fps, hold)
+            else:
+                duration = prepare_trajectory(app, source)
+                clip = render_frames(app, clip_speed(duration, speed, clip_seconds), fps, hold)
+            app.reset_camera()
+
+            path = os.path.join(output_dir, f"{name}.{fmt}")
+            encoder = ENCODERS[fmt](path, size, fps)
+            frames = 0
+            for frame in clip:
+                encoder.write(frame)
+                frames += 1
+            encoder.finish()
+            if app.playback is not None:
+                app.playback.close()
+                app.playback = None
+
+            if pending is not None:
+                wait(pending)
+            pending = encoder, path, frames, time.perf_counter() - start
+        if pending is not None:
+            wait(pending)
+    finally:
+        main.pygame.quit()
+    return outputs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Экспорт взаимодействий в GIF и MP4 без окна")
+    parser.add_argument("paths", nargs="+",
+                        help="записи траекторий и файлы replay.py (.jsonl, ролик на запись)")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default="gif",
+                        help="gif — Pillow, mp4 — нужен ffmpeg")
+    parser.add_argument("--output-dir", default="clips")
+    parser.add_argument("--fps", type=int, default=FPS, help="кадров в секунду ролика")
+    parser.add_argument("--speed", type=int, default=None,
+                        help="ускорение времени (по умолчанию под --clip-seconds)")
+    parser.add_argument("--clip-seconds", type=float, default=CLIP_SECONDS,
+                        help="предел длины ролика при автоматическом ускорении, сек")
+    parser.add_argument("--hold", type=float, default=HOLD_SECONDS,
+                        help="сколько держать последний кадр, сек")
+    parser.add_argument("--no-sprites", action="store_true",
+                        help="рисовать геометрические фигуры вместо атласа спрайтов")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from replay import ReplayMismatch
+
+    args = parse_args(argv)
+
+    def progress(path, frames, seconds):
+        print(f"{path}: {frames} кадров за {seconds:.1f} с "
+              f"({frames / max(seconds, 1e-9):.0f} кадров/с)")
+
+    try:
+        outputs = export_clips(args.paths, args.output_dir, args.format, args.fps,
+                               args.speed, args.clip_seconds, args.hold,
+                               not args.no_sprites, progress)
+    except (OSError, RuntimeError, ReplayMismatch) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    print(f"Роликов: {len(outputs)} → {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,25 @@
 """Генерирует спрайты (изображения) для дрона и ракеты"""
-from PIL import Image, ImageDraw
+import hashlib
+import json
+import math
+import os
+
+# Атлас спрайтов: ракета, заранее повёрнутая на ROCKET_ANGLES углов,
+# и дрон в нескольких масштабах. main.py грузит его один раз.
+ATLAS_DIR = os.path.dirname(os.path.abspath(__file__))
+ATLAS_PNG = os.path.join(ATLAS_DIR, "sprites_atlas.png")
+ATLAS_JSON = os.path.join(ATLAS_DIR, "sprites_atlas.json")
+ROCKET_ANGLES = 360
+ROCKET_SIZE = 36
+DRONE_SIZE = 32
+DRONE_SCALES = (0.5, 0.75, 1.0, 1.5, 2.0)
+ATLAS_COLUMNS = 24
+
+
+def draw_rocket(size=50):
+    """Изображение ракеты (острие вверх)"""
+    from PIL import Image, ImageDraw
 
-def create_rocket_sprite(filename, size=50):
-    """Создает изображение ракеты"""
     img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
     draw = ImageDraw.Draw(img)
     
@@ -22,12 +39,19 @@ def create_rocket_sprite(filename, size=50):
          center[0] + radius, center[1] + radius],
         fill=(255, 255, 0, 255)
     )
-    
-    img.save(filename)
+    return img
+
+
+def create_rocket_sprite(filename, size=50):
+    """Создает изображение ракеты"""
+    draw_rocket(size).save(filename)
     print(f"✓ Ракета сохранена в {filename}")
 
-def create_drone_sprite(filename, size=50):
-    """Создает изображение дрона (квадрокоптера)"""
+
+def draw_drone(size=50):
+    """Изображение дрона (квадрокоптера)"""
+    from PIL import Image, ImageDraw
+
     img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
     draw = ImageDraw.Draw(img)
     
@@ -77,11 +101,91 @@ def create_drone_sprite(filename, size=50):
         outline=(0, 100, 255, 255),
         width=2
     )
-    
-    img.save(filename)
+    return img
+
+
+def create_drone_sprite(filename, size=50):
+    """Создает изображение дрона (квадрокоптера)"""
+    draw_drone(size).save(filename)
     print(f"✓ Дрон сохранен в {filename}")
 
+
+def atlas_inputs_hash():
+    """Хэш входов атласа: код этого файла и параметры"""
+    with open(__file__, "rb") as f:
+        source = f.read()
+    params = json.dumps([ROCKET_ANGLES, ROCKET_SIZE, DRONE_SIZE, DRONE_SCALES, ATLAS_COLUMNS])
+    return hashlib.sha256(source + params.encode()).hexdigest()
+
+
+def build_atlas(png_path=ATLAS_PNG, json_path=ATLAS_JSON):
+    """
+    Собирает атлас: кадр k — ракета, повёрнутая на курс k градусов
+    (0° — вправо, против часовой стрелки, как missile_angle), затем дрон
+    в каждом масштабе из DRONE_SCALES. Рядом пишется JSON с прямоугольниками.
+    """
+    from PIL import Image
+
+    # Запас, чтобы углы треугольника не обрезались при повороте
+    frame = int(math.ceil(ROCKET_SIZE * math.sqrt(2)))
+    rocket = Image.new('RGBA', (frame, frame), (255, 255, 255, 0))
+    offset = (frame - ROCKET_SIZE) // 2
+    rocket.paste(draw_rocket(ROCKET_SIZE), (offset, offset))
+
+    rows = (ROCKET_ANGLES + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+    drone_sizes = [max(1, int(round(DRONE_SIZE * scale))) for scale in DRONE_SCALES]
+    width = max(ATLAS_COLUMNS * frame, sum(drone_sizes))
+    height = rows * frame + max(drone_sizes)
+    atlas = Image.new('RGBA', (width, height), (255, 255, 255, 0))
+
+    rocket_rects = []
+    for k in range(ROCKET_ANGLES):
+        degrees = k * 360.0 / ROCKET_ANGLES
+        # Исходная ракета смотрит вверх (90°); rotate поворачивает против часовой
+        rotated = rocket.rotate(degrees - 90, resample=Image.Resampling.BICUBIC)
+        x, y = (k % ATLAS_COLUMNS) * frame, (k // ATLAS_COLUMNS) * frame
+        atlas.paste(rotated, (x, y))
+        rocket_rects.append([x, y, frame, frame])
+
+    drone_rects = []
+    x = 0
+    base = draw_drone(DRONE_SIZE * 2)  # масштабируем с запасом, без лесенки
+    for size in drone_sizes:
+        atlas.paste(base.resize((size, size), Image.Resampling.LANCZOS), (x, rows * frame))
+        drone_rects.append([x, rows * frame, size, size])
+        x += size
+
+    atlas.save(png_path)
+    with open(json_path, "w") as f:
+        json.dump({
+            "inputs": atlas_inputs_hash(),
+            "rocket_angles": ROCKET_ANGLES,
+            "rocket": rocket_rects,
+            "drone_scales": list(DRONE_SCALES),
+            "drone": drone_rects,
+        }, f)
+    print(f"✓ Атлас сохранен в {png_path} ({ROCKET_ANGLES} углов ракеты, {len(DRONE_SCALES)} масштабов дрона)")
+
+
+def ensure_atlas(png_path=ATLAS_PNG, json_path=ATLAS_JSON):
+    """
+    Пересобирает атлас, только если его нет или изменились входы.
+    Возвращает метаданные атласа.
+    """
+    try:
+        with open(json_path) as f:
+            meta = json.load(f)
+        if meta.get("inputs") == atlas_inputs_hash() and os.path.exists(png_path):
+            return meta
+    except (OSError, ValueError):
+        pass
+    build_atlas(png_path, json_path)
+    with open(json_path) as f:
+        return json.load(f)
+
+
 if __name__ == "__main__":
     create_rocket_sprite("rocket.png", size=60)
     create_drone_sprite("drone.png", size=60)
+    ensure_atlas()
     print("\n Спрайты успешно созданы!")
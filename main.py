@@ -1,21 +1,28 @@
 import pygame
+import argparse
+import json
 import sys
 import math
 import random
-
-# Инициализация Pygame
-pygame.init()
+import time
+from collections import OrderedDict
+
+from camera import ZOOM_STEP, Camera
+from entities import Explosion
+from simulation import (WIDTH_KM, HEIGHT_KM, DT, DRONE_SPEED_RANGE,
+                        MISSILE_SPEED_RANGE, ZONE_RADIUS_RANGE, Engagement,
+                        make_rng)
+import generate_sprites
+from profiling import PhaseProfiler
+from strategies import EVASION, GUIDANCE
+from swarm import SwarmEngagement
+from trajectory import TrajectoryReader, TrajectoryWriter
 
 # Параметры окна (совпадают с tkinter версией)
-WIDTH_KM = 16.0   # ширина карты в км
-HEIGHT_KM = 12.0  # высота карты в км
 SCALE = 45        # пикселей на 1 км
 WIDTH = int(WIDTH_KM * SCALE)    # 720 px
 HEIGHT = int(HEIGHT_KM * SCALE)  # 540 px
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("🚁 Квадрокоптер vs Ракета — Симуляция перехвата")
-
 # Цвета
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -27,10 +34,114 @@ GRAY = (150, 150, 150)
 DARK_GRAY = (100, 100, 100)
 LIGHT_BLUE = (230, 247, 255)
 LIGHT_GRAY = (160, 196, 255)
-
-font_small = pygame.font.SysFont(None, 18)
-font_medium = pygame.font.SysFont(None, 22)
-font_large = pygame.font.SysFont(None, 32)
+EXPLOSION_COLORS = (YELLOW, (255, 165, 0), (255, 69, 0), (200, 0, 0))  # от внешнего кольца к центру
+
+# Окно и шрифты создаются при первом обращении: импорт модуля не открывает
+# окно и не сканирует системные шрифты
+_screen = None
+
+
+def get_screen():
+    """Поверхность окна; при первом вызове инициализирует дисплей"""
+    global _screen
+    if _screen is None:
+        pygame.display.init()
+        _screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("🚁 Квадрокоптер vs Ракета — Симуляция перехвата")
+    return _screen
+
+
+class _Fonts:
+    """fonts.small / .medium / .large — шрифт создаётся при первом обращении"""
+    SIZES = {"small": 18, "medium": 22, "large": 32}
+
+    def __getattr__(self, name):
+        if name not in self.SIZES:
+            raise AttributeError(name)
+        if not pygame.font.get_init():
+            pygame.font.init()
+        # Встроенный шрифт pygame — то же, что SysFont(None, …), но без поиска по системе
+        font = pygame.font.Font(None, self.SIZES[name])
+        setattr(self, name, font)
+        return font
+
+
+fonts = _Fonts()
+
+# Режимы отрисовки экрана симуляции
+RENDER_FULL = "full"      # полная перерисовка и flip каждый кадр
+RENDER_CACHED = "cached"  # кэш слоёв и обновление только грязных прямоугольников
+
+TEXT_CACHE_SIZE = 512
+_text_cache = OrderedDict()
+
+
+def render_text(font, text, color):
+    """Рендер строки с кэшем поверхностей по (шрифт, текст, цвет)"""
+    key = (font, text, color)
+    surf = _text_cache.get(key)
+    if surf is None:
+        surf = font.render(text, True, color)
+        _text_cache[key] = surf
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surf
+
+
+class SpriteAtlas:
+    """Атлас из generate_sprites.py: ракета по углам и дрон по масштабам"""
+
+    def __init__(self, png_path, meta):
+        image = pygame.image.load(png_path).convert_alpha()
+        self.rocket = [image.subsurface(rect) for rect in meta["rocket"]]
+        self.drone = {scale: image.subsurface(rect)
+                      for scale, rect in zip(meta["drone_scales"], meta["drone"])}
+        self._per_radian = len(self.rocket) / (2 * math.pi)
+
+    def rocket_frame(self, angle):
+        """Кадр ракеты для курса angle (рад, 0 — вправо, против часовой)"""
+        return self.rocket[int(round(angle * self._per_radian)) % len(self.rocket)]
+
+    def drone_frame(self, scale=1.0):
+        """Кадр дрона ближайшего масштаба"""
+        return self.drone[min(self.drone, key=lambda s: abs(s - scale))]
+
+
+def load_sprite_atlas():
+    """
+    Загружает атлас, пересобирая его, если изменились входы генератора.
+    Без Pillow или без права записи в каталог используется уже собранный
+    атлас; если его нет — None (рисуются геометрические фигуры).
+    """
+    try:
+        meta = generate_sprites.ensure_atlas()
+    except (ImportError, OSError):
+        try:
+            with open(generate_sprites.ATLAS_JSON) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+    try:
+        return SpriteAtlas(generate_sprites.ATLAS_PNG, meta)
+    except (pygame.error, OSError, KeyError):
+        return None
+
+
+def load_probability_table(path=None):
+    """
+    Таблица вероятностей (probability_table.py) или None, если она не
+    построена или не установлен NumPy — тогда подсказка не показывается.
+    """
+    try:
+        import probability_table
+    except ImportError:
+        return None
+    try:
+        return probability_table.load_table(path or probability_table.TABLE_PATH)
+    except (OSError, ValueError, KeyError):
+        return None
 
 
 class Button:
@@ -40,15 +151,22 @@ class Button:
         self.color = color
         self.text_color = text_color
         self.hover = False
+        self._surfaces = {}  # (текст, наведение) → готовая поверхность кнопки
 
     def draw(self, surface):
-        color = tuple(min(c + 30, 255)
-                      for c in self.color) if self.hover else self.color
-        pygame.draw.rect(surface, color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 2)
-        text_surf = font_medium.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        key = (self.text, self.hover)
+        button_surf = self._surfaces.get(key)
+        if button_surf is None:
+            color = tuple(min(c + 30, 255)
+                          for c in self.color) if self.hover else self.color
+            button_surf = pygame.Surface(self.rect.size)
+            local_rect = button_surf.get_rect()
+            pygame.draw.rect(button_surf, color, local_rect)
+            pygame.draw.rect(button_surf, BLACK, local_rect, 2)
+            text_surf = render_text(fonts.medium, self.text, self.text_color)
+            button_surf.blit(text_surf, text_surf.get_rect(center=local_rect.center))
+            self._surfaces[key] = button_surf
+        return surface.blit(button_surf, self.rect)
 
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
@@ -68,7 +186,7 @@ class InputField:
         self.error = False
 
     def draw(self, surface):
-        label_surf = font_small.render(self.label, True, BLACK)
+        label_surf = render_text(fonts.small, self.label, BLACK)
         surface.blit(label_surf, (self.rect.x, self.rect.y - 25))
 
         if self.active:
@@ -80,7 +198,7 @@ class InputField:
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, BLACK, self.rect, 2)
 
-        text_surf = font_medium.render(self.value, True, BLACK)
+        text_surf = render_text(fonts.medium, self.value, BLACK)
         surface.blit(text_surf, (self.rect.x + 5, self.rect.y + 5))
 
     def handle_event(self, event):
@@ -92,17 +210,20 @@ class InputField:
             elif event.unicode.isdigit() or event.unicode == '.':
                 self.value += event.unicode
 
-    def get_value(self):
+    def peek_value(self):
+        """Значение поля или None, если оно вне границ; флаг ошибки не трогает"""
         try:
             val = float(self.value) if self.value else 0
-            if val < self.min_val or val > self.max_val:
-                self.error = True
-                return None
-            self.error = False
-            return val
         except ValueError:
-            self.error = True
             return None
+        if val < self.min_val or val > self.max_val:
+            return None
+        return val
+
+    def get_value(self):
+        val = self.peek_value()
+        self.error = val is None
+        return val
 
     def set_value(self, value):
         self.value = str(value)
@@ -111,22 +232,76 @@ class InputField:
 
 STATE_SETUP = "setup"
 STATE_RUNNING = "running"
+STATE_PLAYBACK = "playback"
+STATE_SWARM = "swarm"
+
+# Ускорение времени: клавиши 1–4 на экране симуляции (None — максимум)
+TIME_SCALES = {pygame.K_1: 1, pygame.K_2: 10, pygame.K_3: 100, pygame.K_4: None}
+MAX_FRAME_TIME = 0.25  # сек; длиннее кадр не догоняем (после зависаний)
+
+# Окружность радиусом больше стольких пикселей рисуется ломаной по видимой
+# дуге: pygame.draw.circle тратит время пропорционально радиусу
+RING_ARC_PX = 2 * (WIDTH + HEIGHT)
+
+# Полоса перемотки в режиме просмотра записи
+SCRUB_BAR = pygame.Rect(10, HEIGHT - 18, WIDTH - 20, 8)
 
 
 class SimulationApp:
-    def __init__(self):
+    def __init__(self, render_mode=RENDER_CACHED, physics_hz=1 / DT, fps=60,
+                 record_path=None, profile_path=None, use_sprites=True,
+                 table_path=None, guidance="random", evasion="flee", swarm=None,
+                 map_km=(WIDTH_KM, HEIGHT_KM)):
         self.state = STATE_SETUP
+        self.render_mode = render_mode
+        self.use_sprites = use_sprites
+        self._sprites = None
+
+        # Таблица вероятностей для подсказки на экране настройки
+        self.probability_table = load_probability_table(table_path)
+        self._prediction_key = None
+        self._prediction = None
+
+        # Профилирование фаз кадра; панель включается клавишей F3
+        self.profiler = PhaseProfiler()
+        self.profile_path = profile_path
+        self.show_profiler = False
+
+        # Запись траектории (--record) и просмотр записи (--play)
+        self.record_path = record_path
+        self.recorder = None
+        self.playback = None
+        self.playback_pos = 0.0
+
+        # Стратегии наведения ракеты и уклонения дрона (strategies.py)
+        self.guidance = guidance
+        self.evasion = evasion
+
+        # Массированная атака (ракеты, дроны) на карте map_km вместо одного взаимодействия
+        self.swarm_size = swarm
+        self.map_km = map_km if swarm else (WIDTH_KM, HEIGHT_KM)
+        self.swarm = None
+
+        # Камера: колесо — масштаб, правая кнопка — перетаскивание,
+        # F — следовать за дроном, R — вся карта
+        self.camera = Camera.fit(WIDTH, HEIGHT, *self.map_km)
+        self.follow_drone = False
+
+        # Физика идёт фиксированным шагом physics_dt независимо от частоты кадров
+        self.physics_dt = 1.0 / physics_hz
+        self.fps = fps
+        self.time_scale = 1
         self.simulation_paused = False
         self.simulation_finished = False
 
         # Поля ввода (со значениями по умолчанию)
         input_y = 150
         self.drone_speed_input = InputField(
-            100, input_y, 200, 35, "Скорость дрона (км/ч):", 80, 0.1, 200)
+            100, input_y, 200, 35, "Скорость дрона (км/ч):", 80, *DRONE_SPEED_RANGE)
         self.missile_speed_input = InputField(
-            100, input_y + 80, 200, 35, "Скорость ракеты (км/ч):", 120, 0.1, 500)
+            100, input_y + 80, 200, 35, "Скорость ракеты (км/ч):", 120, *MISSILE_SPEED_RANGE)
         self.zone_radius_input = InputField(
-            100, input_y + 160, 200, 35, "Радиус зоны (км):", 3.0, 0.1, 20)
+            100, input_y + 160, 200, 35, "Радиус зоны (км):", 3.0, *ZONE_RADIUS_RANGE)
 
         # Кнопки
         self.start_button = Button(
@@ -141,75 +316,108 @@ class SimulationApp:
         self.speed_missile_kmh = 120.0
         self.zone_radius_km = 3.0
 
+        # Зерно сеанса и номер прогона: любой прогон можно воспроизвести
+        # через replay.py по паре (master_seed, run_index)
+        self.master_seed = random.randrange(2 ** 32)
+        self.run_index = 0
+
         self.clock = pygame.time.Clock()
         self.reset_simulation()
 
+    @property
+    def sprites(self):
+        """Атлас спрайтов; загружается при первой отрисовке (нужно окно)"""
+        if self._sprites is None and self.use_sprites:
+            get_screen()
+            self._sprites = load_sprite_atlas()
+            self.use_sprites = self._sprites is not None  # без атласа не пытаться снова
+        return self._sprites
+
     def km_to_px(self, x_km, y_km):
         """
-        Преобразование из км в пиксели.
+        Преобразование из км в пиксели через камеру.
         Начало (0,0) км = левый НИЖНИЙ угол.
         Canvas (0,0) = левый верхний угол → инвертируем Y.
         """
-        px_x = int(x_km * SCALE)
-        px_y = int((HEIGHT_KM - y_km) * SCALE)
-        return px_x, px_y
+        return self.camera.to_px(x_km, y_km)
+
+    def reset_camera(self):
+        """Вид на всю карту"""
+        self.camera.fit_world(*self.map_km)
+        self.follow_drone = False
+
+    def handle_camera_event(self, event):
+        """Масштаб, перетаскивание и клавиши камеры; True, если событие обработано"""
+        camera = self.camera
+        if event.type == pygame.MOUSEWHEEL:
+            camera.zoom(ZOOM_STEP ** event.y, *pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+            camera.pan(*event.rel)
+            self.follow_drone = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+            self.follow_drone = not self.follow_drone
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            self.reset_camera()
+        else:
+            return False
+        return True
+
+    def update_camera(self):
+        """При слежении держит дрон в центре вида"""
+        if self.follow_drone and self.state != STATE_SWARM:
+            drone = self.engagement.drone
+            self.camera.center_on(*self.interpolate(self.prev_drone_pos, (drone.x, drone.y)))
+
+    def draw_ring(self, surface, color, x_km, y_km, radius_km, width):
+        """
+        Окружность в км, если её контур виден; огромные — ломаной по
+        видимой дуге. Возвращает занятый прямоугольник или None.
+        """
+        camera = self.camera
+        if not camera.ring_visible(x_km, y_km, radius_km, margin_px=width):
+            return None
+        radius_px = camera.length_px(radius_km)
+        if radius_px <= RING_ARC_PX:
+            return pygame.draw.circle(surface, color, camera.to_px(x_km, y_km), radius_px, width)
+        return pygame.draw.lines(surface, color, False,
+                                 camera.arc_points(x_km, y_km, radius_km), width)
 
     def reset_simulation(self):
         """Сброс симуляции"""
-        self.speed_drone = self.speed_drone_kmh / 3600.0  # км/сек
-        self.speed_missile = self.speed_missile_kmh / 3600.0  # км/сек
-
-        # Дрон в центре карты (8, 6) км
-        self.drone_pos = [WIDTH_KM / 2, HEIGHT_KM / 2]
-
-        # Ракета изначально неактивна
-        self.missile_pos = [0.0, 0.0]
-        self.missile_angle = 0.0
-        self.missile_active = False
-        self.missile_direction_change_timer = 0
-        self.missile_direction_change_interval = random.uniform(2, 6)
-
-        self.explosion = False
-        self.explosion_time = 0.0
-        self.explosion_duration = 1.0
-
-        self.time_elapsed = 0.0
-        self.drone_distance = 0.0
-        self.missile_distance = 0.0
-        self.intercepted = False
+        self.engagement = Engagement(self.speed_drone_kmh, self.speed_missile_kmh,
+                                     self.zone_radius_km,
+                                     make_rng(self.master_seed, self.run_index),
+                                     guidance=self.guidance, evasion=self.evasion)
+
+        self.explosion = Explosion(duration=1.0)
+
         self.simulation_finished = False
         self.simulation_paused = False
 
-    def spawn_missile(self):
-        """Генерация стартовой позиции ракеты на краю карты"""
-        side = random.choice(['top', 'bottom', 'left', 'right'])
-        margin_km = 0.3  # минимальный отступ за край
-
-        if side == 'top':
-            x = random.uniform(1, WIDTH_KM - 1)
-            y = HEIGHT_KM + margin_km
-        elif side == 'bottom':
-            x = random.uniform(1, WIDTH_KM - 1)
-            y = -margin_km
-        elif side == 'left':
-            x = -margin_km
-            y = random.uniform(1, HEIGHT_KM - 1)
-        else:  # right
-            x = WIDTH_KM + margin_km
-            y = random.uniform(1, HEIGHT_KM - 1)
-
-        # Направление на дрон (в центре)
-        angle = math.atan2(self.drone_pos[1] - y, self.drone_pos[0] - x)
-        return [x, y], angle
+        # Накопитель времени и предыдущие позиции для интерполяции
+        self.accumulator = 0.0
+        self.save_previous_state()
+
+        # Кэш слоя фона экрана симуляции (см. draw_simulation_cached)
+        self._background = None
+        self._background_key = None
+        self._dirty_rects = []
 
     def draw_setup_screen(self):
         """Рисует экран настройки"""
+        screen = get_screen()
         screen.fill(WHITE)
 
-        title = font_large.render("🚁 Квадрокоптер vs Ракета", True, BLACK)
+        title = render_text(fonts.large, "🚁 Квадрокоптер vs Ракета", BLACK)
         screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 30))
 
-        subtitle = font_medium.render("Симуляция перехвата", True, DARK_GRAY)
+        if self.swarm_size:
+            n_missiles, n_drones = self.swarm_size
+            caption = (f"Массированная атака: {n_missiles} ракет, {n_drones} дронов, "
+                       f"карта {self.map_km[0]:g}×{self.map_km[1]:g} км")
+        else:
+            caption = "Симуляция перехвата"
+        subtitle = render_text(fonts.medium, caption, DARK_GRAY)
         screen.blit(subtitle, (WIDTH // 2 - subtitle.get_width() // 2, 75))
 
         self.drone_speed_input.draw(screen)
@@ -218,86 +426,194 @@ class SimulationApp:
         self.start_button.draw(screen)
 
         if any([self.drone_speed_input.error, self.missile_speed_input.error, self.zone_radius_input.error]):
-            error_text = font_small.render("Ошибка: проверьте значения!", True, RED)
+            error_text = render_text(fonts.small, "Ошибка: проверьте значения!", RED)
             screen.blit(error_text, (100, 420))
 
+        if not self.swarm_size:
+            self.draw_prediction()
         pygame.display.flip()
 
+    def draw_prediction(self):
+        """Вероятность перехвата из таблицы для значений, набранных в полях"""
+        screen = get_screen()
+        if self.probability_table is None:
+            return
+
+        key = (self.drone_speed_input.peek_value(), self.missile_speed_input.peek_value(),
+               self.zone_radius_input.peek_value())
+        if key != self._prediction_key:
+            self._prediction_key = key
+            self._prediction = None if None in key else self.probability_table.query(*key)
+            if self._prediction is not None and math.isnan(self._prediction):
+                self._prediction = None
+
+        if self._prediction is None:
+            text = render_text(fonts.medium, "Вероятность перехвата: —", DARK_GRAY)
+        else:
+            text = render_text(fonts.medium, f"Вероятность перехвата: {self._prediction:.1%}", BLACK)
+        screen.blit(text, (300, 365))
+
     def draw_simulation_screen(self):
         """Рисует экран симуляции"""
-        screen.fill(LIGHT_BLUE)
+        screen = get_screen()
+        self.update_camera()
+        with self.profiler.phase("draw"):
+            if self.state == STATE_SWARM:
+                self.draw_swarm(screen)
+                dirty = None
+            elif self.render_mode == RENDER_CACHED:
+                dirty = self.draw_simulation_cached()
+            else:
+                screen.fill(LIGHT_BLUE)
+                cx, cy = self.drone_px()
+                self.draw_zone(screen, cx, cy)
+                self.draw_entities(screen, cx, cy)
+                dirty = None
+
+        with self.profiler.phase("flip"):
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+
+    def draw_simulation_cached(self):
+        """
+        Отрисовка с кэшем слоёв: фон с зоной обнаружения собирается заново
+        только когда дрон сдвинулся; иначе восстанавливаются и обновляются
+        лишь прямоугольники, занятые подвижными объектами и текстом.
+        Возвращает прямоугольники для обновления (None — весь экран).
+        """
+        screen = get_screen()
+        cx, cy = self.drone_px()
+        key = (cx, cy, self.zone_radius_km, self.camera.key)
+
+        if self._background is None or self._background_key != key:
+            if self._background is None:
+                self._background = pygame.Surface((WIDTH, HEIGHT)).convert()
+            self._background.fill(LIGHT_BLUE)
+            self.draw_zone(self._background, cx, cy)
+            self._background_key = key
+
+            screen.blit(self._background, (0, 0))
+            self._dirty_rects = self.draw_entities(screen, cx, cy)
+            return None
+
+        for rect in self._dirty_rects:
+            screen.blit(self._background, rect, rect)
+        rects = self.draw_entities(screen, cx, cy)
+        dirty = self._dirty_rects + rects
+        self._dirty_rects = rects
+        return dirty
+
+    def save_previous_state(self):
+        """Запоминает позиции перед шагом физики (для интерполяции)"""
+        sim = self.engagement
+        self.prev_drone_pos = (sim.drone.x, sim.drone.y)
+        self.prev_missile_pos = (sim.missile.x, sim.missile.y)
+
+    def interpolate(self, prev, current):
+        """Позиция между двумя шагами физики с долей накопителя alpha"""
+        if self.simulation_finished or self.simulation_paused:
+            return current[0], current[1]
+        alpha = min(self.accumulator / self.physics_dt, 1.0)
+        return (prev[0] + (current[0] - prev[0]) * alpha,
+                prev[1] + (current[1] - prev[1]) * alpha)
+
+    def drone_km(self):
+        """Позиция дрона в км с интерполяцией"""
+        drone = self.engagement.drone
+        return self.interpolate(self.prev_drone_pos, (drone.x, drone.y))
+
+    def drone_px(self):
+        """Экранные координаты дрона"""
+        return self.km_to_px(*self.drone_km())
+
+    def draw_zone(self, surface, cx, cy):
+        """Зона обнаружения (окружность вокруг дрона) с подписью, если контур виден"""
+        if self.draw_ring(surface, GREEN, *self.drone_km(), self.zone_radius_km, 2) is None:
+            return
+        zone_radius_px = self.camera.length_px(self.zone_radius_km)
+
+        zone_text = render_text(fonts.small, f"Зона {self.zone_radius_km} км", GREEN)
+        surface.blit(zone_text, (cx - zone_text.get_width() // 2, cy - zone_radius_px - 20))
+
+    def draw_entities(self, surface, cx, cy):
+        """Кнопки, дрон, ракета, взрыв и статистика; возвращает занятые прямоугольники"""
+        rects = []
 
         # Кнопки управления
         self.pause_button.text = "▶️ Возобн." if self.simulation_paused else "⏸ Пауза"
-        self.pause_button.draw(screen)
-        self.reset_button.draw(screen)
+        rects.append(self.pause_button.draw(surface))
+        rects.append(self.reset_button.draw(surface))
 
-        # Дрон в центре (8, 6) км
-        drone_px = self.km_to_px(self.drone_pos[0], self.drone_pos[1])
-        cx, cy = drone_px
+        sim = self.engagement
 
-        # Зона обнаружения (окружность вокруг дрона)
-        zone_radius_px = int(self.zone_radius_km * SCALE)
-        pygame.draw.circle(screen, GREEN, (cx, cy), zone_radius_px, 2)
+        # Дрон и взрыв рисуются, только если попадают в окно (с запасом)
+        drone_visible = -40 <= cx <= WIDTH + 40 and -40 <= cy <= HEIGHT + 40
 
-        # Подпись зоны
-        zone_text = font_small.render(f"Зона {self.zone_radius_km} км", True, GREEN)
-        screen.blit(zone_text, (cx - zone_text.get_width() // 2, cy - zone_radius_px - 20))
-
-        # Дрон (квадрат с цветом) в CENTER
-        drone_size = 15
-        pygame.draw.rect(screen, BLUE, (cx - drone_size, cy - drone_size,
-                                        drone_size * 2, drone_size * 2))
-        pygame.draw.rect(screen, (30, 60, 150), (cx - drone_size, cy - drone_size,
-                                                   drone_size * 2, drone_size * 2), 2)
+        # Дрон: спрайт из атласа или квадрат с цветом
+        if not drone_visible:
+            pass
+        elif self.sprites is not None:
+            drone_surf = self.sprites.drone_frame(1.0)
+            rects.append(surface.blit(drone_surf, drone_surf.get_rect(center=(cx, cy))))
+        else:
+            drone_size = 15
+            rects.append(pygame.draw.rect(surface, BLUE, (cx - drone_size, cy - drone_size,
+                                                          drone_size * 2, drone_size * 2)))
+            pygame.draw.rect(surface, (30, 60, 150), (cx - drone_size, cy - drone_size,
+                                                        drone_size * 2, drone_size * 2), 2)
 
-        # Ракета (треугольник)
-        if self.missile_active and not self.explosion:
-            mx, my = self.km_to_px(self.missile_pos[0], self.missile_pos[1])
+        # Ракета: повёрнутый кадр из атласа или треугольник
+        missile = sim.missile
+        if missile.active and not self.explosion.active:
+            mx, my = self.km_to_px(*self.interpolate(self.prev_missile_pos, (missile.x, missile.y)))
 
             # Проверка видимости (с запасом)
-            if (-50 <= mx <= WIDTH + 50) and (-50 <= my <= HEIGHT + 50):
-                # Треугольник указывает в направлении полета
-                tip_x = mx + 15 * math.cos(self.missile_angle)
-                tip_y = my + 15 * math.sin(self.missile_angle)
+            visible = (-50 <= mx <= WIDTH + 50) and (-50 <= my <= HEIGHT + 50)
+            if visible and self.sprites is not None:
+                rocket_surf = self.sprites.rocket_frame(missile.angle)
+                rects.append(surface.blit(rocket_surf, rocket_surf.get_rect(center=(mx, my))))
+            elif visible:
+                # Треугольник указывает в направлении полета (ось Y экрана вниз)
+                tip_x = mx + 15 * math.cos(missile.angle)
+                tip_y = my - 15 * math.sin(missile.angle)
 
                 side_angle = math.pi / 2
-                left_x = mx + 8 * math.cos(self.missile_angle + side_angle)
-                left_y = my + 8 * math.sin(self.missile_angle + side_angle)
-                right_x = mx + 8 * math.cos(self.missile_angle - side_angle)
-                right_y = my + 8 * math.sin(self.missile_angle - side_angle)
+                left_x = mx + 8 * math.cos(missile.angle + side_angle)
+                left_y = my - 8 * math.sin(missile.angle + side_angle)
+                right_x = mx + 8 * math.cos(missile.angle - side_angle)
+                right_y = my - 8 * math.sin(missile.angle - side_angle)
 
-                pygame.draw.polygon(screen, RED, [
+                rects.append(pygame.draw.polygon(surface, RED, [
                     (tip_x, tip_y), (left_x, left_y), (right_x, right_y)
-                ])
-                pygame.draw.polygon(screen, (180, 20, 20), [
+                ]))
+                rects.append(pygame.draw.polygon(surface, (180, 20, 20), [
                     (tip_x, tip_y), (left_x, left_y), (right_x, right_y)
-                ], 2)
+                ], 2))
 
         # Взрыв
-        if self.explosion:
+        if self.explosion.active and drone_visible:
             ex, ey = cx, cy  # взрыв в центре (где дрон)
-            progress = min(1.0, self.explosion_time / self.explosion_duration)
+            progress = self.explosion.progress
             base_radius = 20
 
-            colors = [YELLOW, (255, 165, 0), (255, 69, 0), (200, 0, 0)]
-            for i, color in enumerate(colors):
+            for i, color in enumerate(EXPLOSION_COLORS):
                 radius = int(base_radius * (0.6 + 0.4 * progress) * (1.0 - i * 0.2))
                 if radius > 0:
-                    pygame.draw.circle(screen, color, (ex, ey), radius)
+                    rects.append(pygame.draw.circle(surface, color, (ex, ey), radius))
 
         # Статистика слева
         info_texts = [
-            f"⏱ Время: {self.time_elapsed:.2f} сек",
-            f"🚁 Дрон пройден: {self.drone_distance:.3f} км",
-            f"🚀 Ракета пройдена: {self.missile_distance:.3f} км",
+            f"⏱ Время: {sim.time_elapsed:.2f} сек",
+            f"🚁 Дрон пройден: {sim.drone.distance:.3f} км",
+            f"🚀 Ракета пройдена: {missile.distance:.3f} км",
+            f"🎲 Зерно: {self.master_seed}/{self.run_index}",
+            f"⏩ Скорость: {'макс.' if self.time_scale is None else f'{self.time_scale}×'} (1–4)",
         ]
 
-        if self.missile_active:
-            dist = math.hypot(
-                self.missile_pos[0] - self.drone_pos[0],
-                self.missile_pos[1] - self.drone_pos[1]
-            )
+        if missile.active:
+            dist = sim.separation()
             info_texts.append(f"📏 Расстояние: {dist:.3f} км")
         else:
             info_texts.append("📏 Расстояние: -- км")
@@ -305,82 +621,243 @@ class SimulationApp:
         if self.simulation_paused:
             info_texts.append("⏸ ПАУЗА")
         if self.simulation_finished:
-            if self.intercepted:
+            if sim.intercepted:
                 info_texts.append("✅ Ракета перехвачена!")
             else:
                 info_texts.append("❌ Ракета ушла")
 
-        for i, text in enumerate(info_texts):
-            surf = font_small.render(text, True, BLACK)
-            screen.blit(surf, (10, 60 + i * 25))
+        if self.playback is not None:
+            info_texts.append(f"📼 Шаг: {int(self.playback_pos) + 1}/{len(self.playback)} (←/→, Home/End)")
+            rects.append(self.draw_scrub_bar(surface))
 
-        pygame.display.flip()
+        for i, text in enumerate(info_texts):
+            surf = render_text(fonts.small, text, BLACK)
+            rects.append(surface.blit(surf, (10, 60 + i * 25)))
+
+        if self.show_profiler:
+            rects.append(self.draw_profiler_overlay(surface))
+
+        # Запас на сглаживание контуров
+        return [rect.inflate(2, 2) for rect in rects]
+
+    def draw_profiler_overlay(self, surface):
+        """Панель p50/p95/max по фазам кадра в правом нижнем углу"""
+        lines = self.profiler.lines() or ["нет замеров"]
+        surfs = [render_text(fonts.small, line, WHITE) for line in lines]
+        width = max(surf.get_width() for surf in surfs) + 12
+        height = 18 * len(surfs) + 8
+        panel = pygame.Rect(WIDTH - width - 10, HEIGHT - height - 30, width, height)
+        pygame.draw.rect(surface, DARK_GRAY, panel)
+        for i, surf in enumerate(surfs):
+            surface.blit(surf, (panel.x + 6, panel.y + 4 + 18 * i))
+        return panel
+
+    def step_physics(self):
+        """Один фиксированный шаг физики"""
+        dt = self.physics_dt  # шаг симуляции в секундах
+        if self.state == STATE_SWARM:
+            if self.swarm.step(dt):
+                self.simulation_finished = True
+                self.simulation_paused = True
+            return
+        self.save_previous_state()
 
-    def update_simulation(self):
-        """Основной цикл обновления"""
-        if not self.simulation_paused:
-            dt = 0.05  # шаг симуляции в секундах
+        # Взрыв
+        if self.explosion.active:
+            if self.explosion.update(dt):
+                self.simulation_finished = True
+                self.simulation_paused = True
 
-            # Взрыв
-            if self.explosion:
-                self.explosion_time += dt
-                if self.explosion_time >= self.explosion_duration:
+        # Если ракета еще летит
+        else:
+            finished = self.engagement.step(dt)
+            if self.recorder is not None:
+                self.recorder.append_engagement(self.engagement)
+                if finished:
+                    self.stop_recording()
+
+            if finished:
+                if self.engagement.intercepted:
+                    self.explosion.start()
+                else:
                     self.simulation_finished = True
                     self.simulation_paused = True
 
-            # Если ракета еще летит
-            if self.missile_active and not self.explosion:
-                self.time_elapsed += dt
-
-                # Изменение направления ракеты (случайные маневры)
-                self.missile_direction_change_timer += dt
-                if self.missile_direction_change_timer >= self.missile_direction_change_interval:
-                    turn = random.uniform(-math.pi / 6, math.pi / 6)  # ±30 градусов
-                    self.missile_angle += turn
-                    self.missile_direction_change_timer = 0
-                    self.missile_direction_change_interval = random.uniform(2, 6)
-
-                # Движение ракеты
-                dx_m = math.cos(self.missile_angle) * self.speed_missile * dt
-                dy_m = math.sin(self.missile_angle) * self.speed_missile * dt
-                self.missile_pos[0] += dx_m
-                self.missile_pos[1] += dy_m
-                self.missile_distance += math.hypot(dx_m, dy_m)
-
-                # Расстояние до дрона
-                dist_to_drone = math.hypot(
-                    self.missile_pos[0] - self.drone_pos[0],
-                    self.missile_pos[1] - self.drone_pos[1]
-                )
-
-                # Движение дрона (убегает от ракеты если она в зоне)
-                if dist_to_drone <= self.zone_radius_km:
-                    if dist_to_drone > 0.01:
-                        # Направление ВЫХОДА из опасности (от ракеты)
-                        dir_x = (self.drone_pos[0] - self.missile_pos[0]) / dist_to_drone
-                        dir_y = (self.drone_pos[1] - self.missile_pos[1]) / dist_to_drone
-                        dx_d = dir_x * self.speed_drone * dt
-                        dy_d = dir_y * self.speed_drone * dt
-                        self.drone_pos[0] += dx_d
-                        self.drone_pos[1] += dy_d
-                        self.drone_distance += math.hypot(dx_d, dy_d)
-
-                    # Проверка перехвата
-                    new_dist = math.hypot(
-                        self.missile_pos[0] - self.drone_pos[0],
-                        self.missile_pos[1] - self.drone_pos[1]
-                    )
-                    if new_dist < 0.1 and not self.explosion:  # 100 метров
-                        self.explosion = True
-                        self.explosion_time = 0
-                        self.intercepted = True
-
-                # Проверка: покинула ли ракета зону досягаемости
-                if (self.missile_pos[0] < -5 or self.missile_pos[0] > WIDTH_KM + 5 or
-                    self.missile_pos[1] < -5 or self.missile_pos[1] > HEIGHT_KM + 5):
-                    self.simulation_finished = True
-                    self.simulation_paused = True
-                    self.missile_active = False
+    def start_swarm(self):
+        """Запуск массированной атаки с параметрами экрана настройки"""
+        self.state = STATE_SWARM
+        self.swarm = SwarmEngagement(*self.swarm_size, self.speed_drone_kmh,
+                                     self.speed_missile_kmh, self.zone_radius_km,
+                                     make_rng(self.master_seed, self.run_index),
+                                     *self.map_km)
+        self.simulation_finished = False
+        self.simulation_paused = False
+        self.accumulator = 0.0
+        self.reset_camera()
+
+    def draw_swarm(self, surface):
+        """
+        Экран массированной атаки. Объекты выбираются сетками swarm только
+        в пределах окна, поэтому время кадра зависит от видимого, а не от
+        размера карты и числа объектов на ней.
+        """
+        camera, swarm = self.camera, self.swarm
+        surface.fill(LIGHT_BLUE)
+
+        # Граница карты (pygame сам отсекает невидимые стороны)
+        width_km, height_km = self.map_km
+        left, top = camera.to_px(0.0, height_km)
+        right, bottom = camera.to_px(width_km, 0.0)
+        pygame.draw.rect(surface, GRAY, (left, top, right - left, bottom - top), 1)
+
+        missiles, drones = swarm.visible(*camera.view_km(margin_px=10))
+
+        # Зоны — только когда различимы
+        if camera.length_px(swarm.zone_radius_km) >= 3:
+            for drone in drones:
+                self.draw_ring(surface, GREEN, drone.pos[0], drone.pos[1], swarm.zone_radius_km, 1)
+
+        shown_drones = 0
+        for drone in drones:
+            if camera.visible(drone.pos[0], drone.pos[1], margin_px=5):
+                x, y = camera.to_px(drone.pos[0], drone.pos[1])
+                pygame.draw.rect(surface, BLUE, (x - 4, y - 4, 8, 8))
+                shown_drones += 1
+
+        # Ракета — треугольник по курсу (ось Y экрана вниз)
+        for missile in missiles:
+            x, y = camera.to_px(missile.pos[0], missile.pos[1])
+            c, s = math.cos(missile.angle), math.sin(missile.angle)
+            pygame.draw.polygon(surface, RED, [
+                (x + 8 * c, y - 8 * s),
+                (x - 4 * c + 4 * s, y + 4 * s + 4 * c),
+                (x - 4 * c - 4 * s, y + 4 * s - 4 * c),
+            ])
+
+        self.pause_button.text = "▶️ Возобн." if self.simulation_paused else "⏸ Пауза"
+        self.pause_button.draw(surface)
+        self.reset_button.draw(surface)
+
+        active = len(swarm.missiles) - swarm.missiles_intercepted - swarm.missiles_escaped
+        info_texts = [
+            f"⏱ Время: {swarm.time_elapsed:.2f} сек",
+            f"🚀 Ракет в полёте: {active}/{len(swarm.missiles)}",
+            f"✅ Перехвачено: {swarm.missiles_intercepted}, ушло: {swarm.missiles_escaped}",
+            f"🚁 Дронов потеряно: {swarm.drones_lost}/{len(swarm.drones)}",
+            f"👁 В окне: {len(missiles)} ракет, {shown_drones} дронов",
+            f"🔍 Масштаб: {camera.scale:.3g} px/км (колесо, правая кнопка, R)",
+            f"🎲 Зерно: {self.master_seed}/{self.run_index}",
+            f"⏩ Скорость: {'макс.' if self.time_scale is None else f'{self.time_scale}×'} (1–4)",
+        ]
+        if self.simulation_paused and not self.simulation_finished:
+            info_texts.append("⏸ ПАУЗА")
+        if self.simulation_finished:
+            info_texts.append("🏁 Атака завершена")
+        for i, text in enumerate(info_texts):
+            surface.blit(render_text(fonts.small, text, BLACK), (10, 60 + i * 25))
+
+        if self.show_profiler:
+            self.draw_profiler_overlay(surface)
+
+    def start_recording(self):
+        """Открывает файл траектории для текущего прогона (если задан --record)"""
+        self.stop_recording()
+        if self.record_path:
+            self.recorder = TrajectoryWriter(self.record_path, {
+                "speed_drone_kmh": self.speed_drone_kmh,
+                "speed_missile_kmh": self.speed_missile_kmh,
+                "zone_radius_km": self.zone_radius_km,
+                "dt": self.physics_dt,
+                "master_seed": self.master_seed,
+                "run_index": self.run_index,
+            })
+            self.recorder.append_engagement(self.engagement)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def open_playback(self, path):
+        """Открывает запись траектории (через mmap) для просмотра и перемотки"""
+        self.playback = TrajectoryReader(path)
+        meta = self.playback.metadata
+        self.speed_drone_kmh = meta.get("speed_drone_kmh", self.speed_drone_kmh)
+        self.speed_missile_kmh = meta.get("speed_missile_kmh", self.speed_missile_kmh)
+        self.zone_radius_km = meta.get("zone_radius_km", self.zone_radius_km)
+        self.playback_dt = meta.get("dt", DT)
+        self.master_seed = meta.get("master_seed", self.master_seed)
+        self.run_index = meta.get("run_index", self.run_index)
+        self.reset_simulation()
+        self.state = STATE_PLAYBACK
+        self.seek_playback(0)
+
+    def seek_playback(self, index):
+        """Переходит к шагу index записи"""
+        last = len(self.playback) - 1
+        index = max(0, min(int(index), last))
+        self.playback_pos = float(index)
+
+        row = self.playback.row(index)
+        sim = self.engagement
+        drone, missile = sim.drone, sim.missile
+        sim.time_elapsed = row["time"]
+        drone.x, drone.y = row["drone_x"], row["drone_y"]
+        missile.x, missile.y = row["missile_x"], row["missile_y"]
+        missile.angle = row["missile_angle"]
+        drone.distance = row["drone_distance"]
+        missile.distance = row["missile_distance"]
+        missile.active = bool(row["missile_active"])
+        sim.intercepted = bool(row["intercepted"])
+
+        self.simulation_finished = index == last
+        if self.simulation_finished and sim.intercepted:
+            self.explosion.finish()
+        else:
+            self.explosion.reset()
+        self.save_previous_state()
+        if self.simulation_finished:
+            self.simulation_paused = True
+
+    def update_playback(self, frame_time):
+        """Воспроизведение записи с текущим ускорением времени"""
+        if not self.simulation_paused:
+            if self.time_scale is None:
+                self.seek_playback(len(self.playback) - 1)
+            else:
+                step = min(frame_time, MAX_FRAME_TIME) * self.time_scale / self.playback_dt
+                target = self.playback_pos + step
+                self.seek_playback(target)
+                if not self.simulation_finished:
+                    self.playback_pos = target  # дробная часть шага копится
+        self.draw_simulation_screen()
+
+    def draw_scrub_bar(self, surface):
+        """Полоса перемотки с положением текущего шага"""
+        pygame.draw.rect(surface, WHITE, SCRUB_BAR)
+        pygame.draw.rect(surface, DARK_GRAY, SCRUB_BAR, 1)
+        last = max(len(self.playback) - 1, 1)
+        x = SCRUB_BAR.x + int(SCRUB_BAR.width * int(self.playback_pos) / last)
+        return pygame.draw.rect(surface, BLUE, (x - 3, SCRUB_BAR.y - 4, 6, SCRUB_BAR.height + 8)).union(SCRUB_BAR)
+
+    def update_simulation(self, frame_time):
+        """
+        Основной цикл обновления: реальное время кадра (с учётом ускорения)
+        копится в накопителе и расходуется фиксированными шагами физики.
+        В режиме «макс.» шаги идут, пока не исчерпан бюджет кадра.
+        """
+        with self.profiler.phase("physics"):
+            if not self.simulation_paused:
+                if self.time_scale is None:
+                    deadline = time.perf_counter() + 0.8 / self.fps
+                    while not self.simulation_paused and time.perf_counter() < deadline:
+                        self.step_physics()
+                    self.accumulator = 0.0
+                else:
+                    self.accumulator += min(frame_time, MAX_FRAME_TIME) * self.time_scale
+                    while not self.simulation_paused and self.accumulator >= self.physics_dt:
+                        self.step_physics()
+                        self.accumulator -= self.physics_dt
 
         self.draw_simulation_screen()
 
@@ -405,12 +882,17 @@ class SimulationApp:
                         self.speed_drone_kmh = drone_val
                         self.speed_missile_kmh = missile_val
                         self.zone_radius_km = zone_val
+                        self.run_index += 1
+                        if self.swarm_size:
+                            self.start_swarm()
+                            continue
                         self.state = STATE_RUNNING
                         self.reset_simulation()
 
                         # Спавн ракеты и запуск симуляции
-                        self.missile_pos, self.missile_angle = self.spawn_missile()
-                        self.missile_active = True
+                        self.engagement.launch()
+                        self.save_previous_state()
+                        self.start_recording()
                         self.simulation_paused = False
             else:
                 self.start_button.update(pygame.mouse.get_pos())
@@ -422,6 +904,8 @@ class SimulationApp:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            if self.handle_camera_event(event):
+                continue
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self.pause_button.update(event.pos)
@@ -431,31 +915,121 @@ class SimulationApp:
                     self.simulation_paused = not self.simulation_paused
 
                 if self.reset_button.is_clicked(event.pos):
+                    self.stop_recording()
                     self.state = STATE_SETUP
                     self.simulation_finished = False
+            elif event.type == pygame.KEYDOWN and event.key in TIME_SCALES:
+                self.time_scale = TIME_SCALES[event.key]
+                self.accumulator = 0.0
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
             else:
                 self.pause_button.update(pygame.mouse.get_pos())
                 self.reset_button.update(pygame.mouse.get_pos())
 
         return True
 
+    def handle_playback_events(self):
+        """Обработка событий в режиме просмотра записи"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if self.handle_camera_event(event):
+                continue
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.pause_button.is_clicked(event.pos):
+                    self.simulation_paused = not self.simulation_paused
+                elif self.reset_button.is_clicked(event.pos):
+                    self.seek_playback(0)
+                    self.simulation_paused = True
+
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                pressed = event.type == pygame.MOUSEBUTTONDOWN or event.buttons[0]
+                if pressed and SCRUB_BAR.inflate(0, 16).collidepoint(event.pos):
+                    fraction = (event.pos[0] - SCRUB_BAR.x) / SCRUB_BAR.width
+                    self.seek_playback(round(fraction * (len(self.playback) - 1)))
+                    self.simulation_paused = True
+                self.pause_button.update(event.pos)
+                self.reset_button.update(event.pos)
+
+            elif event.type == pygame.KEYDOWN:
+                jump = 100 if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_SPACE:
+                    self.simulation_paused = not self.simulation_paused
+                elif event.key == pygame.K_RIGHT:
+                    self.seek_playback(self.playback_pos + jump)
+                elif event.key == pygame.K_LEFT:
+                    self.seek_playback(self.playback_pos - jump)
+                elif event.key == pygame.K_HOME:
+                    self.seek_playback(0)
+                elif event.key == pygame.K_END:
+                    self.seek_playback(len(self.playback) - 1)
+                elif event.key in TIME_SCALES:
+                    self.time_scale = TIME_SCALES[event.key]
+                elif event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+
+        return True
+
     def run(self):
         """Главный цикл"""
+        get_screen()  # окно — до первого опроса событий
         running = True
         while running:
+            frame_time = self.clock.tick(self.fps) / 1000.0
             if self.state == STATE_SETUP:
                 self.draw_setup_screen()
                 running = self.handle_setup_events()
+            elif self.state == STATE_PLAYBACK:
+                self.update_playback(frame_time)
+                with self.profiler.phase("events"):
+                    running = self.handle_playback_events()
             else:
-                self.update_simulation()
-                running = self.handle_simulation_events()
-
-            self.clock.tick(30)
+                self.update_simulation(frame_time)
+                with self.profiler.phase("events"):
+                    running = self.handle_simulation_events()
 
+        self.stop_recording()
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    app = SimulationApp()
+    parser = argparse.ArgumentParser(description="Квадрокоптер vs Ракета — симуляция перехвата")
+    parser.add_argument("--render", choices=[RENDER_CACHED, RENDER_FULL], default=RENDER_CACHED,
+                        help="cached — кэш слоёв и грязные прямоугольники, full — полная перерисовка")
+    parser.add_argument("--physics-hz", type=float, default=1 / DT,
+                        help="частота шагов физики, Гц (по умолчанию 20)")
+    parser.add_argument("--fps", type=int, default=60, help="частота кадров")
+    parser.add_argument("--record", metavar="FILE",
+                        help="записывать траекторию каждого прогона в файл")
+    parser.add_argument("--play", metavar="FILE",
+                        help="просмотр записанной траектории с перемоткой")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="при выходе записать статистику фаз кадра в JSON")
+    parser.add_argument("--no-sprites", action="store_true",
+                        help="рисовать геометрические фигуры вместо атласа спрайтов")
+    parser.add_argument("--guidance", choices=sorted(GUIDANCE), default="random",
+                        help="наведение ракеты: random — случайные повороты, pn — пропорциональная навигация")
+    parser.add_argument("--evasion", choices=sorted(EVASION), default="flee",
+                        help="уклонение дрона: flee, break (поперёк курса ракеты), zigzag")
+    parser.add_argument("--table", metavar="FILE",
+                        help="таблица вероятностей (по умолчанию probability_table.npy)")
+    parser.add_argument("--swarm", nargs=2, type=int, metavar=("MISSILES", "DRONES"),
+                        help="массированная атака (swarm.py) вместо одного взаимодействия")
+    parser.add_argument("--map-km", nargs=2, type=float, metavar=("WIDTH", "HEIGHT"),
+                        default=(WIDTH_KM, HEIGHT_KM),
+                        help="размер карты для --swarm, км (по умолчанию 16 12)")
+    args = parser.parse_args()
+
+    app = SimulationApp(render_mode=args.render, physics_hz=args.physics_hz, fps=args.fps,
+                        record_path=args.record, profile_path=args.profile,
+                        use_sprites=not args.no_sprites, table_path=args.table,
+                        guidance=args.guidance, evasion=args.evasion,
+                        swarm=args.swarm, map_km=tuple(args.map_km))
+    if args.play:
+        app.open_playback(args.play)
     app.run()
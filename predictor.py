@@ -0,0 +1,429 @@
+"""
+Аналитический прогноз перехвата на прямолинейном участке полёта ракеты.
+
+Пока ракета летит прямо, а дрон убегает строго от неё, относительное
+движение решается в замкнутом виде. Пусть θ — угол между курсом ракеты
+и направлением с ракеты на дрон, r — расстояние, k = v_дрона / v_ракеты:
+
+    dr/dt = v_д − v_р·cos θ,    r·dθ/dt = v_р·sin θ
+    r(θ) = C · tg(θ/2)^k / sin θ,    C = r₀ · sin θ₀ / tg(θ₀/2)^k
+
+θ растёт со временем; r убывает, пока cos θ > k, и минимален при
+θ* = arccos k. Время до угла θ (s = tg(θ/2)):
+
+    t(θ) = C / (2·v_р) · [F(s) − F(s₀)],
+    F(s) = s^(k−1)/(k−1) + s^(k+1)/(k+1)    (k ≠ 1),    F(s) = ln s + s²/2    (k = 1)
+
+Модель непрерывная: от шагового счёта с dt она отличается на величину
+порядка (v_р + v_д)·dt, поэтому пограничные случаи стоит досчитывать шагами.
+Результаты кэшируются (LRU) по квантованным входам, так что повторные
+запросы в переборах почти ничего не стоят. skip_segments_batch — та же
+перемотка для строк пакета batch.BatchEngine: NumPy без кэша, корни
+ищутся методом Ньютона сразу для всех строк.
+"""
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+from simulation import (WIDTH_KM, HEIGHT_KM, DT, INTERCEPT_DISTANCE_KM,
+                        BOUNDS_MARGIN_KM)
+
+INTERCEPT = "intercept"  # дрон перехвачен на участке
+ESCAPE = "escape"        # ракета вышла из зоны обнаружения на участке
+OPEN = "open"            # участок кончился раньше любого из событий
+
+# Шаги квантования ключа кэша
+SPEED_STEP_KMH = 0.01
+RADIUS_STEP_KM = 1e-3
+ANGLE_STEP = 1e-4
+OFFSET_STEP_KM = 1e-4
+
+CACHE_SIZE = 1 << 16
+
+# Участки короче этого числа шагов дешевле досчитать шагами
+# (и у самой границы зоны непрерывная модель заметно расходится с шаговой)
+MIN_SKIP_STEPS = 10
+
+NEWTON_ITERATIONS = 16  # предел итераций _solve_batch (обычно сходится за 5–8)
+
+SegmentPrediction = namedtuple(
+    "SegmentPrediction",
+    ["outcome", "time", "distance", "angle", "min_distance"])
+
+
+def segment_geometry(missile_pos, missile_angle, drone_pos):
+    """
+    Параметры участка по позициям: (entry_angle, offset_km, side).
+    entry_angle — угол между курсом ракеты и направлением на дрон (0…π),
+    offset_km — расстояние до дрона, side — с какой стороны курса дрон (±1).
+    """
+    rx = drone_pos[0] - missile_pos[0]
+    ry = drone_pos[1] - missile_pos[1]
+    ux, uy = math.cos(missile_angle), math.sin(missile_angle)
+    along = ux * rx + uy * ry
+    across = ux * ry - uy * rx
+    return math.atan2(abs(across), along), math.hypot(rx, ry), 1.0 if across >= 0 else -1.0
+
+
+def _antiderivative(s, k):
+    if abs(k - 1.0) < 1e-9:
+        return math.log(s) + s * s / 2
+    return s ** (k - 1) / (k - 1) + s ** (k + 1) / (k + 1)
+
+
+def _bisect(func, lo, hi, iterations=48):
+    """Корень монотонной func на [lo, hi] (знаки на концах разные)"""
+    f_lo = func(lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = func(mid)
+        if (f_mid > 0) == (f_lo > 0):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return 0.5 * (lo + hi)
+
+
+def _trajectory(vd, vm, theta0, r0):
+    """Функции ln r(θ) и t(θ) для участка с началом (θ₀, r₀)"""
+    k = vd / vm
+    s0 = math.tan(theta0 / 2)
+    log_c = math.log(r0) + math.log(math.sin(theta0)) - k * math.log(s0)
+    f0 = _antiderivative(s0, k)
+    scale = math.exp(log_c) / (2 * vm)
+
+    def log_r(theta):
+        return log_c + k * math.log(math.tan(theta / 2)) - math.log(math.sin(theta))
+
+    def time_to(theta):
+        return scale * (_antiderivative(math.tan(theta / 2), k) - f0)
+
+    return log_r, time_to
+
+
+def _clamp_angle(theta0):
+    return min(theta0, math.pi - 1e-9)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _profile(q_drone, q_missile, q_zone, q_angle, q_offset):
+    """
+    Профиль участка по квантованным входам:
+    (время перехвата или None, угол перехвата, r_min, время выхода из зоны, угол выхода).
+    """
+    vd = q_drone * SPEED_STEP_KMH / 3600.0
+    vm = q_missile * SPEED_STEP_KMH / 3600.0
+    zone = q_zone * RADIUS_STEP_KM
+    theta0 = q_angle * ANGLE_STEP
+    r0 = q_offset * OFFSET_STEP_KM
+    k = vd / vm
+
+    if r0 < INTERCEPT_DISTANCE_KM:
+        return 0.0, theta0, r0, None, None
+
+    # Лобовой курс: θ остаётся 0, расстояние меняется линейно
+    if theta0 < ANGLE_STEP / 2:
+        closing = vm - vd
+        if closing > 0:
+            return (r0 - INTERCEPT_DISTANCE_KM) / closing, 0.0, 0.0, None, None
+        return None, None, r0, (zone - r0) / -closing if closing < 0 else None, 0.0
+
+    theta0 = _clamp_angle(theta0)
+    log_r, time_to = _trajectory(vd, vm, theta0, r0)
+
+    # Точка наибольшего сближения
+    theta_min = math.acos(k) if k < 1 else 0.0
+    if theta_min > theta0:
+        r_min = math.exp(log_r(theta_min))
+    else:
+        theta_min, r_min = theta0, r0
+
+    if r_min < INTERCEPT_DISTANCE_KM:
+        log_target = math.log(INTERCEPT_DISTANCE_KM)
+        theta_hit = _bisect(lambda th: log_r(th) - log_target, theta0, theta_min)
+        return time_to(theta_hit), theta_hit, r_min, None, None
+
+    # Выход из зоны: r снова растёт до радиуса зоны (r → ∞ при θ → π)
+    log_zone = math.log(zone)
+    if r0 >= zone and theta_min == theta0:
+        return None, None, r_min, 0.0, theta0
+    theta_exit = _bisect(lambda th: log_r(th) - log_zone, theta_min, math.pi - 1e-12)
+    return None, None, r_min, time_to(theta_exit), theta_exit
+
+
+def segment_state(speed_drone_kmh, speed_missile_kmh, entry_angle, offset_km, t):
+    """
+    (θ, r) через t секунд погони с начала участка (entry_angle, offset_km).
+    Считается без кэша: t в переборах почти не повторяется.
+    """
+    vd = speed_drone_kmh / 3600.0
+    vm = speed_missile_kmh / 3600.0
+    if entry_angle < ANGLE_STEP / 2:
+        return 0.0, offset_km - (vm - vd) * t
+    theta0 = _clamp_angle(entry_angle)
+    log_r, time_to = _trajectory(vd, vm, theta0, offset_km)
+    hi = theta0
+    while time_to(hi) < t:  # t(θ) → ∞ при θ → π
+        hi = 0.5 * (hi + math.pi)
+    theta = _bisect(lambda th: time_to(th) - t, theta0, hi)
+    return theta, math.exp(log_r(theta))
+
+
+def predict_segment(speed_drone_kmh, speed_missile_kmh, zone_radius_km,
+                    entry_angle, offset_km, duration=math.inf):
+    """
+    Прогноз на участке длительностью duration (до следующей смены курса).
+    entry_angle и offset_km — см. segment_geometry. Возвращает
+    SegmentPrediction: outcome (INTERCEPT, ESCAPE или OPEN), time — время
+    события от начала участка, distance и angle — r и θ в этот момент,
+    min_distance — наибольшее сближение на всём участке без учёта duration.
+    """
+    t_hit, theta_hit, r_min, t_exit, theta_exit = _profile(
+        int(round(speed_drone_kmh / SPEED_STEP_KMH)),
+        int(round(speed_missile_kmh / SPEED_STEP_KMH)),
+        int(round(zone_radius_km / RADIUS_STEP_KM)),
+        int(round(entry_angle / ANGLE_STEP)),
+        int(round(offset_km / OFFSET_STEP_KM)),
+    )
+    if t_hit is not None and t_hit <= duration:
+        return SegmentPrediction(INTERCEPT, t_hit, INTERCEPT_DISTANCE_KM, theta_hit, r_min)
+    if t_exit is not None and t_exit <= duration:
+        return SegmentPrediction(ESCAPE, t_exit, zone_radius_km, theta_exit, r_min)
+    return SegmentPrediction(OPEN, duration, None, None, r_min)
+
+
+def skip_segment(engagement, dt=DT, max_steps=None):
+    """
+    Перематывает участок simulation.Engagement, пока ракета летит прямо,
+    если его исход известен с запасом (v_р + v_д)·dt на расхождение
+    с шаговым счётом:
+      - перехват завершает взаимодействие;
+      - выход ракеты из зоны переносит её на шаг после выхода, а дрон
+        остаётся там, где погоня кончилась;
+      - если до смены курса не случится ни того, ни другого, погоня
+        проматывается до шага перед сменой курса.
+    Время перемотки кратно dt. Возвращает True, если участок перемотан;
+    иначе состояние не меняется.
+    """
+    e = engagement
+    if not (e.guidance.piecewise_straight and e.evasion.radial):
+        return False  # решение в замкнутом виде — только для прямого курса и бегства
+    if e.speed_drone >= e.speed_missile:
+        return False  # ракета не догоняет: погоня идёт у границы зоны, перематывать нечего
+    margin = (e.speed_missile + e.speed_drone) * dt
+    d, m = e.drone, e.missile
+    entry, offset, side = segment_geometry((m.x, m.y), m.angle, (d.x, d.y))
+    steps_left = int((m.turn_interval - m.turn_timer) / dt) - 1
+    p = predict_segment(e.speed_drone_kmh, e.speed_missile_kmh, e.zone_radius_km,
+                        entry, offset, steps_left * dt)
+
+    if p.outcome == INTERCEPT:
+        if p.min_distance >= INTERCEPT_DISTANCE_KM - margin:
+            return False
+        n_steps = math.ceil(p.time / dt)
+        chase, angle, distance = p.time, p.angle, p.distance
+    elif p.outcome == ESCAPE:
+        if p.min_distance <= INTERCEPT_DISTANCE_KM + margin:
+            return False
+        n_steps = math.ceil(p.time / dt)
+        chase, angle, distance = p.time, p.angle, p.distance
+    else:
+        n_steps = steps_left
+        chase = n_steps * dt
+        angle, distance = segment_state(e.speed_drone_kmh, e.speed_missile_kmh,
+                                        entry, offset, chase)
+        if distance <= INTERCEPT_DISTANCE_KM + margin:
+            return False  # к концу участка ракета почти догнала дрон
+
+    if n_steps < MIN_SKIP_STEPS or (max_steps is not None and n_steps > max_steps):
+        return False
+    t = n_steps * dt
+    ux, uy = math.cos(m.angle), math.sin(m.angle)
+    missile_x = m.x + ux * e.speed_missile * t
+    missile_y = m.y + uy * e.speed_missile * t
+    if (abs(missile_x - WIDTH_KM / 2) > WIDTH_KM / 2 + BOUNDS_MARGIN_KM or
+            abs(missile_y - HEIGHT_KM / 2) > HEIGHT_KM / 2 + BOUNDS_MARGIN_KM):
+        return False  # ракета раньше уйдёт за границы — считаем шагами
+
+    # Дрон в конце погони: на расстоянии distance под углом angle к курсу
+    heading = m.angle + side * angle
+    d.x = m.x + ux * e.speed_missile * chase + distance * math.cos(heading)
+    d.y = m.y + uy * e.speed_missile * chase + distance * math.sin(heading)
+    d.distance += e.speed_drone * chase
+    m.x = missile_x
+    m.y = missile_y
+    m.distance += e.speed_missile * t
+    m.turn_timer += t
+    e.time_elapsed += t
+    e.steps += 1
+
+    if p.outcome == INTERCEPT:
+        e.intercepted = True
+        e.finished = True
+        e.log("intercept", d.x, d.y)
+    return True
+
+
+def _solve_batch(func, deriv, lo, hi, start=None, iterations=NEWTON_ITERATIONS):
+    """
+    Корни монотонных func на [lo, hi] поэлементно: метод Ньютона от start
+    (по умолчанию — середина), а где шаг выходит за сужающийся отрезок —
+    деление пополам. Сходится за несколько итераций, поэтому дешевле
+    _bisect на массивах.
+    """
+    import numpy as np
+
+    rising = func(lo) < 0
+    x = 0.5 * (lo + hi) if start is None else np.clip(start, lo, hi)
+    for _ in range(iterations):
+        f = func(x)
+        above = (f > 0) == rising  # корень левее x
+        hi = np.where(above, x, hi)
+        lo = np.where(above, lo, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x - f / deriv(x)
+        step = np.where((newton >= lo) & (newton <= hi), newton, 0.5 * (lo + hi))
+        done = np.all(np.abs(step - x) <= 1e-12 * (1.0 + np.abs(x)))
+        x = step
+        if done:
+            break
+    return x
+
+
+def _trajectory_batch(k, vm, theta0, r0):
+    """
+    _trajectory для массивов начал участков (θ₀, r₀), но в переменной
+    u = ln tg(θ/2): в ней ln r(u) и t(u) гладкие и выпуклые, и метод
+    Ньютона сходится за несколько итераций и у θ → π. Возвращает
+    (u₀, ln r, d ln r / du, t, dt/du).
+    """
+    import numpy as np
+
+    u0 = np.log(np.tan(theta0 / 2))
+    log_c = np.log(r0) + np.log(np.sin(theta0)) - k * u0
+
+    def antiderivative(u):
+        if abs(k - 1.0) < 1e-9:
+            return u + np.exp(2 * u) / 2
+        return np.exp((k - 1) * u) / (k - 1) + np.exp((k + 1) * u) / (k + 1)
+
+    f0 = antiderivative(u0)
+    scale = np.exp(log_c) / (2 * vm)
+
+    # sin θ = 2s / (1 + s²), s = eᵘ
+    def log_r(u):
+        return log_c + (k - 1) * u + np.logaddexp(0.0, 2 * u) - math.log(2)
+
+    def d_log_r(u):
+        return (k - 1) + 2 / (1 + np.exp(-2 * u))
+
+    def time_to(u):
+        return scale * (antiderivative(u) - f0)
+
+    def d_time_to(u):
+        return scale * np.exp((k - 1) * u) * (1 + np.exp(2 * u))
+
+    return u0, log_r, d_log_r, time_to, d_time_to
+
+
+def skip_segments_batch(b, rows, dt=DT, max_time=None):
+    """
+    Векторная форма skip_segment для строк rows пакета batch.BatchEngine:
+    те же исходы, запас на расхождение с шаговым счётом и проверки, но
+    без кэша и квантования (профиль считается для всех строк сразу).
+    Лобовой курс и строки, где дрон уже почти перехвачен, остаются шагам.
+    Возвращает (перемотанные строки, перехваченные из них).
+    """
+    import numpy as np
+
+    vd, vm = b.speed_drone, b.speed_missile
+    k = vd / vm
+    margin = (vm + vd) * dt
+    empty = rows[:0]
+
+    # Геометрия участка (segment_geometry)
+    ux, uy = np.cos(b.angle[rows]), np.sin(b.angle[rows])
+    rx = b.drone_x[rows] - b.missile_x[rows]
+    ry = b.drone_y[rows] - b.missile_y[rows]
+    along = ux * rx + uy * ry
+    across = ux * ry - uy * rx
+    theta0 = np.minimum(np.arctan2(np.abs(across), along), math.pi - 1e-9)
+    r0 = np.hypot(rx, ry)
+    steps_left = np.floor((b.interval[rows] - b.timer[rows]) / dt) - 1
+    keep = ((steps_left >= MIN_SKIP_STEPS) & (theta0 >= ANGLE_STEP / 2) &
+            (r0 >= INTERCEPT_DISTANCE_KM))
+    if not keep.any():
+        return empty, empty
+    rows, ux, uy, across, theta0, r0, steps_left = (
+        a[keep] for a in (rows, ux, uy, across, theta0, r0, steps_left))
+    side = np.where(across >= 0, 1.0, -1.0)
+    duration = steps_left * dt
+
+    # Профиль участка (_profile), углы — в переменной u = ln tg(θ/2)
+    u0, log_r, d_log_r, time_to, _ = _trajectory_batch(k, vm, theta0, r0)
+    u_min = np.maximum(u0, math.log(math.tan(math.acos(k) / 2)))
+    r_min = np.exp(log_r(u_min))
+    hit = r_min < INTERCEPT_DISTANCE_KM
+
+    # Ближайшее событие участка: перехват или выход ракеты из зоны
+    # (если ракета уже на границе и удаляется — выход сразу)
+    target = np.where(hit, math.log(INTERCEPT_DISTANCE_KM), math.log(b.zone_radius_km))
+    lo = np.where(hit, u0, u_min)
+    hi = np.where(hit, u_min, math.log(math.tan((math.pi - 1e-12) / 2)))
+    u_event = _solve_batch(lambda u: log_r(u) - target, d_log_r, lo, hi)
+    t_event = time_to(u_event)
+    t_event[~hit & (r0 >= b.zone_radius_km) & (u_min == u0)] = 0.0
+    happens = t_event <= duration
+
+    # Отказ, если исход близок к границе перехвата с запасом margin
+    ok = np.where(happens,
+                  np.where(hit, r_min < INTERCEPT_DISTANCE_KM - margin,
+                           r_min > INTERCEPT_DISTANCE_KM + margin),
+                  True)
+    n_steps = np.where(happens, np.ceil(t_event / dt), steps_left)
+    chase = np.where(happens, t_event, n_steps * dt)
+
+    # Участок без события — состояние погони к концу участка (segment_state)
+    u = u_event.copy()
+    distance = np.where(hit, INTERCEPT_DISTANCE_KM, b.zone_radius_km)
+    open_ = np.flatnonzero(~happens)
+    if len(open_):
+        u0, log_r, _, time_to, d_time_to = _trajectory_batch(k, vm, theta0[open_], r0[open_])
+        # Начальное приближение — по касательной в начале участка
+        u[open_] = _solve_batch(lambda u: time_to(u) - chase[open_], d_time_to,
+                                u0, u_event[open_], u0 + chase[open_] / d_time_to(u0))
+        distance[open_] = np.exp(log_r(u[open_]))
+        ok[open_] &= distance[open_] > INTERCEPT_DISTANCE_KM + margin
+
+    ok &= n_steps >= MIN_SKIP_STEPS
+    if max_time is not None:
+        ok &= n_steps <= np.floor((max_time - b.clock[rows]) / dt)
+    t = n_steps * dt
+    missile_x = b.missile_x[rows] + ux * vm * t
+    missile_y = b.missile_y[rows] + uy * vm * t
+    ok &= ((np.abs(missile_x - WIDTH_KM / 2) <= WIDTH_KM / 2 + BOUNDS_MARGIN_KM) &
+           (np.abs(missile_y - HEIGHT_KM / 2) <= HEIGHT_KM / 2 + BOUNDS_MARGIN_KM))
+
+    # Дрон в конце погони: на расстоянии distance под углом θ = 2·arctg(eᵘ) к курсу
+    ok = np.flatnonzero(ok)
+    rows = rows[ok]
+    heading = b.angle[rows] + side[ok] * 2 * np.arctan(np.exp(u[ok]))
+    b.drone_x[rows] = (b.missile_x[rows] + ux[ok] * vm * chase[ok] +
+                       distance[ok] * np.cos(heading))
+    b.drone_y[rows] = (b.missile_y[rows] + uy[ok] * vm * chase[ok] +
+                       distance[ok] * np.sin(heading))
+    b.drone_dist[rows] += vd * chase[ok]
+    b.missile_x[rows] = missile_x[ok]
+    b.missile_y[rows] = missile_y[ok]
+    b.timer[rows] += t[ok]
+    b.clock[rows] += t[ok]
+    return rows, rows[(happens & hit)[ok]]
+
+
+def cache_info():
+    """Статистика кэша прогнозов"""
+    return _profile.cache_info()
+
+
+def cache_clear():
+    _profile.cache_clear()
@@ -0,0 +1,189 @@
+"""
+Таблица вероятности перехвата по (скорость дрона, скорость ракеты, радиус зоны).
+
+Таблица считается один раз перебором sweep.py по всему диапазону,
+допустимому в полях ввода, и хранится как массив float32 в файле .npy
+(открывается через mmap) с описанием осей в соседнем .json. Запрос —
+трилинейная интерполяция по восьми соседним узлам, без прогонов.
+
+    python probability_table.py build --counts 12 12 12 --trials 1000
+    python probability_table.py build --trials 20000 --tolerance 0.01
+    python probability_table.py query 80 120 3
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from simulation import DRONE_SPEED_RANGE, MISSILE_SPEED_RANGE, ZONE_RADIUS_RANGE
+from sweep import build_grid, grid_axis, run_sweep
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probability_table.npy")
+AXES = ("speed_drone_kmh", "speed_missile_kmh", "zone_radius_km")
+BOUNDS = (DRONE_SPEED_RANGE, MISSILE_SPEED_RANGE, ZONE_RADIUS_RANGE)
+
+
+def metadata_path(path):
+    """Файл с описанием осей рядом с таблицей"""
+    return os.path.splitext(path)[0] + ".json"
+
+
+class _MemorySink:
+    """Приёмник run_sweep, собирающий вероятности прямо в массив"""
+
+    def __init__(self, shape):
+        self.values = np.full(shape, np.nan, dtype=np.float32)
+        self.done = {}
+
+    def write(self, row):
+        # Та же оценка, что в sweep.py: доля перехватов среди завершившихся
+        # за max_time; узел, где не завершилось ни одного, остаётся NaN
+        self.values[row["i"], row["j"], row["k"]] = row["probability"]
+
+
+def build_table(path=TABLE_PATH, counts=(12, 12, 12), trials=1000, master_seed=0,
+                workers=None, max_time=1800.0, progress=None, tolerance=None):
+    """
+    Считает таблицу по всему допустимому диапазону и пишет её в path.
+    С tolerance узел останавливается досрочно (см. sweep.run_cell),
+    trials — верхний предел.
+    """
+    axes = [grid_axis((lo, hi, count), (lo, hi), name)
+            for (lo, hi), count, name in zip(BOUNDS, counts, AXES)]
+    sink = _MemorySink(tuple(len(axis) for axis in axes))
+    run_sweep(build_grid(*axes), sink, trials, master_seed, workers, max_time, progress,
+              tolerance=tolerance)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, sink.values)
+    os.replace(tmp, path)
+    with open(metadata_path(path), "w") as f:
+        json.dump({
+            "axes": dict(zip(AXES, axes)),
+            "trials": trials,
+            "seed": master_seed,
+            "max_time": max_time,
+            "tolerance": tolerance,
+        }, f, indent=2)
+    return ProbabilityTable(path)
+
+
+class ProbabilityTable:
+    """Таблица из файла (через mmap) с интерполирующими запросами"""
+
+    def __init__(self, path=TABLE_PATH):
+        self.values = np.load(path, mmap_mode="r")
+        with open(metadata_path(path)) as f:
+            self.metadata = json.load(f)
+        self.axes = [np.asarray(self.metadata["axes"][name]) for name in AXES]
+        if self.values.shape != tuple(len(axis) for axis in self.axes):
+            raise ValueError(f"{path}: размер таблицы не совпадает с осями")
+
+    def query(self, speed_drone_kmh, speed_missile_kmh, zone_radius_km):
+        """
+        Вероятность перехвата для скаляров или массивов (с broadcasting).
+        Значения вне диапазона таблицы прижимаются к её краю. Узлы, где ни
+        одно взаимодействие не завершилось (NaN), пропускаются, а веса
+        остальных углов ячейки нормируются; NaN — только если пусты все углы.
+        """
+        points = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                       (speed_drone_kmh, speed_missile_kmh, zone_radius_km)))
+        lower, frac = [], []
+        for axis, x in zip(self.axes, points):
+            if len(axis) == 1:
+                lower.append(np.zeros(x.shape, dtype=np.intp))
+                frac.append(np.zeros(x.shape))
+                continue
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            lower.append(i)
+            frac.append(np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+
+        result = np.zeros(points[0].shape)
+        total = np.zeros(points[0].shape)
+        plain = np.zeros(points[0].shape)
+        count = np.zeros(points[0].shape)
+        for corner in range(8):
+            weight = np.ones(points[0].shape)
+            index = []
+            for dim in range(3):
+                upper = (corner >> dim) & 1
+                size = len(self.axes[dim])
+                index.append(np.minimum(lower[dim] + upper, size - 1))
+                weight = weight * (frac[dim] if upper else 1.0 - frac[dim])
+            value = self.values[tuple(index)]
+            finite = np.isfinite(value)
+            value = np.where(finite, value, 0.0)
+            result += weight * value
+            total += np.where(finite, weight, 0.0)
+            plain += value
+            count += finite
+        # Нулевой суммарный вес при конечных углах — точка ровно на пустом
+        # узле; тогда берём среднее конечных углов ячейки
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(total > 0, result / total, plain / count)
+        return result if result.ndim else float(result)
+
+    __call__ = query
+
+
+def load_table(path=TABLE_PATH):
+    """Таблица или None, если файл ещё не построен"""
+    if not os.path.exists(path) or not os.path.exists(metadata_path(path)):
+        return None
+    return ProbabilityTable(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Таблица вероятности перехвата")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="посчитать таблицу перебором")
+    build.add_argument("--counts", nargs=3, type=int, default=[12, 12, 12],
+                       metavar=("DRONE", "MISSILE", "ZONE"), help="узлов по каждой оси")
+    build.add_argument("--trials", type=int, default=1000,
+                       help="число взаимодействий на узел")
+    build.add_argument("--seed", type=int, default=0, help="главное зерно")
+    build.add_argument("--workers", type=int, default=None,
+                       help="число процессов (по умолчанию все ядра)")
+    build.add_argument("--max-time", type=float, default=1800.0,
+                       help="предел симулируемого времени на взаимодействие, сек")
+    build.add_argument("--tolerance", type=float, default=None,
+                       help="остановить узел, когда 95%% интервал вероятности "
+                            "не шире ±tolerance (--trials — предел; проверяется "
+                            "после каждого пакета, см. sweep.py)")
+    build.add_argument("--output", default=TABLE_PATH)
+
+    query = commands.add_parser("query", help="вероятность для набора параметров")
+    query.add_argument("params", nargs=3, type=float,
+                       metavar=("DRONE_KMH", "MISSILE_KMH", "ZONE_KM"))
+    query.add_argument("--table", default=TABLE_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "build":
+        def progress(done, total, row):
+            print(f"[{done}/{total}] дрон {row['speed_drone_kmh']:.1f} км/ч, "
+                  f"ракета {row['speed_missile_kmh']:.1f} км/ч, "
+                  f"зона {row['zone_radius_km']:.2f} км → P = {row['probability']:.4f}")
+
+        table = build_table(args.output, args.counts, args.trials, args.seed,
+                            args.workers, args.max_time, progress, args.tolerance)
+        print(f"Таблица {table.values.shape} → {args.output}")
+        return 0
+
+    table = load_table(args.table)
+    if table is None:
+        print(f"Нет таблицы {args.table}: сначала python probability_table.py build",
+              file=sys.stderr)
+        return 1
+    print(f"P = {table.query(*args.params):.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
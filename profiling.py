@@ -0,0 +1,109 @@
+"""
+Лёгкое профилирование по фазам кадра (события, физика, отрисовка, flip).
+
+Для каждой фазы хранится скользящее окно последних замеров в кольцевом
+буфере; p50/p95/max считаются по запросу. Замер стоит два вызова
+perf_counter, поэтому профилировщик можно держать включённым постоянно.
+"""
+import json
+import time
+from array import array
+
+WINDOW = 300  # замеров на фазу (~5 секунд при 60 кадрах/с)
+
+
+class _Phase:
+    """Контекстный менеджер одного замера; создаётся один раз на фазу"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class _NullPhase:
+    """Замер-заглушка для выключенного профилировщика"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class PhaseProfiler:
+    """Скользящая статистика длительности фаз"""
+
+    def __init__(self, window=WINDOW, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._samples = {}  # фаза → кольцевой буфер длительностей, сек
+        self._next = {}     # фаза → позиция записи
+        self._count = {}    # фаза → всего замеров
+        self._phases = {}
+
+    def phase(self, name):
+        """with profiler.phase("physics"): ... — замер длительности блока"""
+        if not self.enabled:
+            return _NULL_PHASE
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def record(self, name, seconds):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = array("d")
+            self._next[name] = 0
+            self._count[name] = 0
+        if len(samples) < self.window:
+            samples.append(seconds)
+        else:
+            samples[self._next[name]] = seconds
+        self._next[name] = (self._next[name] + 1) % self.window
+        self._count[name] += 1
+
+    def stats(self):
+        """{фаза: {"p50", "p95", "max" (мс), "count"}} по текущему окну"""
+        result = {}
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+            n = len(ordered)
+            result[name] = {
+                "p50": ordered[n // 2] * 1000.0,
+                "p95": ordered[min(n - 1, int(n * 0.95))] * 1000.0,
+                "max": ordered[-1] * 1000.0,
+                "count": self._count[name],
+            }
+        return result
+
+    def lines(self):
+        """Строки для экранной панели"""
+        return [
+            f"{name:8s} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  max {s['max']:6.2f} мс"
+            for name, s in self.stats().items()
+        ]
+
+    def export(self, path):
+        """Пишет статистику в JSON"""
+        with open(path, "w") as f:
+            json.dump({"window": self.window, "phases": self.stats()}, f,
+                      indent=2, ensure_ascii=False)
+
+    def reset(self):
+        self._samples.clear()
+        self._next.clear()
+        self._count.clear()
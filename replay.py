@@ -0,0 +1,175 @@
+"""
+Воспроизведение прогонов.
+
+Запись прогона — главное зерно, номер прогона, параметры и журнал событий
+(спавн, смены курса, итог). По ней прогон повторяется бит в бит: поток
+случайных чисел восстанавливается через simulation.make_rng, а журнал
+сверяется с исходным.
+
+    python replay.py search --params 20 300 8 --seed 1 --runs 10000 \\
+                            --intercepted --output interesting.jsonl
+    python replay.py check interesting.jsonl
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+from profiling import PhaseProfiler
+from simulation import DT, Engagement, EngagementResult, drive, make_rng
+from strategies import EVASION, GUIDANCE
+
+ReplayRecord = namedtuple(
+    "ReplayRecord", ["master_seed", "run_index", "params", "events", "result"])
+
+
+class ReplayMismatch(Exception):
+    """Повторный прогон разошёлся с записью"""
+
+
+def record_run(master_seed, run_index, speed_drone_kmh, speed_missile_kmh,
+               zone_radius_km, dt=DT, max_time=None, integrator="fixed",
+               profiler=None, guidance="random", evasion="flee"):
+    """Прогоняет взаимодействие с журналом событий и возвращает запись"""
+    params = {
+        "speed_drone_kmh": speed_drone_kmh,
+        "speed_missile_kmh": speed_missile_kmh,
+        "zone_radius_km": zone_radius_km,
+        "dt": dt,
+        "max_time": max_time,
+        "integrator": integrator,
+        "guidance": guidance,
+        "evasion": evasion,
+    }
+    engagement, result = _run(master_seed, run_index, params, profiler)
+    return ReplayRecord(master_seed, run_index, params, engagement.events, result)
+
+
+def _run(master_seed, run_index, params, profiler=None, states=None):
+    engagement = Engagement(params["speed_drone_kmh"], params["speed_missile_kmh"],
+                            params["zone_radius_km"], make_rng(master_seed, run_index),
+                            record_events=True,
+                            guidance=params.get("guidance", "random"),
+                            evasion=params.get("evasion", "flee"))
+    result = drive(engagement, params["dt"], params["max_time"], params["integrator"],
+                   profiler, states)
+    return engagement, result
+
+
+def replay(record, states=None):
+    """
+    Повторяет прогон по записи и сверяет журнал и итог бит в бит.
+    Возвращает объект Engagement в конечном состоянии. С states
+    (entities.StateStore) в него пишутся снапшоты прогона, как в drive().
+    """
+    engagement, result = _run(record.master_seed, record.run_index, record.params,
+                              states=states)
+    for i, (expected, actual) in enumerate(zip(record.events, engagement.events)):
+        if expected != actual:
+            raise ReplayMismatch(f"событие {i}: записано {expected}, получено {actual}")
+    if len(record.events) != len(engagement.events):
+        raise ReplayMismatch(
+            f"записано {len(record.events)} событий, получено {len(engagement.events)}")
+    if record.result != result:
+        raise ReplayMismatch(f"итог: записано {record.result}, получено {result}")
+    return engagement
+
+
+def search(master_seed, runs, speed_drone_kmh, speed_missile_kmh, zone_radius_km,
+           predicate, start=0, **kwargs):
+    """Перебирает прогоны start..start+runs и отдаёт записи, прошедшие фильтр"""
+    for run_index in range(start, start + runs):
+        record = record_run(master_seed, run_index, speed_drone_kmh,
+                            speed_missile_kmh, zone_radius_km, **kwargs)
+        if predicate(record.result):
+            yield record
+
+
+def save_records(path, records, mode="w"):
+    """Пишет записи в файл JSON Lines (по одной на строку)"""
+    count = 0
+    with open(path, mode) as f:
+        for record in records:
+            f.write(json.dumps(record._asdict(), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def load_records(path):
+    """Читает записи из файла JSON Lines"""
+    records = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            data["events"] = [tuple(event) for event in data["events"]]
+            data["result"] = EngagementResult(*data["result"])
+            records.append(ReplayRecord(**data))
+    return records
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение прогонов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    find = commands.add_parser("search", help="найти и записать интересные прогоны")
+    find.add_argument("--params", nargs=3, type=float, required=True,
+                      metavar=("DRONE_KMH", "MISSILE_KMH", "ZONE_KM"))
+    find.add_argument("--seed", type=int, default=0, help="главное зерно")
+    find.add_argument("--runs", type=int, default=1000)
+    find.add_argument("--start", type=int, default=0, help="первый номер прогона")
+    find.add_argument("--integrator", choices=["fixed", "event", "predict"],
+                      default="event")
+    find.add_argument("--max-time", type=float, default=None)
+    find.add_argument("--guidance", choices=sorted(GUIDANCE), default="random")
+    find.add_argument("--evasion", choices=sorted(EVASION), default="flee")
+    outcome = find.add_mutually_exclusive_group()
+    outcome.add_argument("--intercepted", action="store_true",
+                         help="только перехваты")
+    outcome.add_argument("--escaped", action="store_true",
+                         help="только уходы ракеты")
+    find.add_argument("--output", default="replays.jsonl")
+    find.add_argument("--profile", metavar="FILE",
+                      help="записать статистику длительности шагов в JSON")
+
+    check = commands.add_parser("check", help="воспроизвести записи и сверить их")
+    check.add_argument("path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "search":
+        if args.intercepted:
+            predicate = lambda result: result.intercepted  # noqa: E731
+        elif args.escaped:
+            predicate = lambda result: not result.intercepted  # noqa: E731
+        else:
+            predicate = lambda result: True  # noqa: E731
+        profiler = PhaseProfiler() if args.profile else None
+        records = search(args.seed, args.runs, *args.params, predicate,
+                         start=args.start, max_time=args.max_time,
+                         integrator=args.integrator, profiler=profiler,
+                         guidance=args.guidance, evasion=args.evasion)
+        count = save_records(args.output, records)
+        print(f"Записано прогонов: {count} → {args.output}")
+        if profiler is not None:
+            profiler.export(args.profile)
+        return 0
+
+    failed = 0
+    records = load_records(args.path)
+    for record in records:
+        try:
+            replay(record)
+        except ReplayMismatch as e:
+            failed += 1
+            print(f"Прогон {record.master_seed}/{record.run_index}: {e}")
+    print(f"Проверено: {len(records)}, расхождений: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Сервер расчётов: JSON Lines поверх TCP или Unix-сокета (asyncio).
+
+Запрос — одна строка JSON с параметрами экрана настройки, зерном и числом
+взаимодействий; поля "id", "max_time", "guidance", "evasion" и "chunk"
+необязательны:
+
+    {"id": 1, "speed_drone_kmh": 80, "speed_missile_kmh": 120,
+     "zone_radius_km": 3, "seed": 7, "trials": 100000}
+
+Взаимодействия считаются пакетами по chunk штук в пуле процессов, цикл
+событий не блокируется. После каждого пакета клиент получает строку
+{"type": "partial", ...} с накопленными итогами, в конце — {"type": "result", ...};
+ошибка — {"type": "error", "error": ...}. Одинаковые запросы, пока первый
+ещё считается, не запускаются заново: все подписчики получают один поток
+итогов (уже вышедшие частичные итоги досылаются сразу). У пакета своё
+зерно (seed, номер пакета), поэтому итог не зависит от порядка готовности.
+В пуле одновременно не больше двух пакетов на процесс; пакетов в запросе —
+не больше MAX_CHUNKS. Если процесс пула погиб, подписчики получают ошибку,
+а пул создаётся заново.
+
+    python server.py --port 8765
+    python server.py --unix /tmp/bpla.sock
+    echo '{"speed_drone_kmh": 20, "speed_missile_kmh": 300, "zone_radius_km": 8, "seed": 1, "trials": 20000}' | nc 127.0.0.1 8765
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from batch import run_batch
+from simulation import DRONE_SPEED_RANGE, MISSILE_SPEED_RANGE, ZONE_RADIUS_RANGE
+from strategies import EVASION, GUIDANCE
+
+DEFAULT_PORT = 8765
+CHUNK_TRIALS = 2000
+MAX_TRIALS = 10_000_000
+MAX_CHUNKS = 10_000   # пакетов в одном запросе
+MAX_LINE = 64 * 1024  # байт на строку запроса
+
+PARAMS = (
+    ("speed_drone_kmh", DRONE_SPEED_RANGE),
+    ("speed_missile_kmh", MISSILE_SPEED_RANGE),
+    ("zone_radius_km", ZONE_RADIUS_RANGE),
+)
+
+
+def parse_request(message):
+    """Проверенные параметры запроса; ValueError с понятным текстом при ошибке"""
+    if not isinstance(message, dict):
+        raise ValueError("запрос должен быть объектом JSON")
+    params = {}
+    for name, (lo, hi) in PARAMS:
+        value = message.get(name)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not lo <= value <= hi:
+            raise ValueError(f"{name}: нужно число в пределах {lo}..{hi}")
+        params[name] = float(value)
+
+    for name, default, hi in (("trials", None, MAX_TRIALS), ("chunk", CHUNK_TRIALS, MAX_TRIALS)):
+        value = message.get(name, default)
+        if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= hi:
+            raise ValueError(f"{name}: нужно целое в пределах 1..{hi}")
+        params[name] = value
+    if -(-params["trials"] // params["chunk"]) > MAX_CHUNKS:
+        raise ValueError(f"chunk: не больше {MAX_CHUNKS} пакетов на запрос, "
+                         f"нужно chunk >= {-(-params['trials'] // MAX_CHUNKS)}")
+
+    seed = message.get("seed", 0)
+    if not isinstance(seed, int) or isinstance(seed, bool) or seed < 0:
+        raise ValueError("seed: нужно неотрицательное целое")
+    params["seed"] = seed
+
+    max_time = message.get("max_time")
+    if max_time is not None and (not isinstance(max_time, (int, float)) or max_time <= 0):
+        raise ValueError("max_time: нужно положительное число")
+    params["max_time"] = None if max_time is None else float(max_time)
+
+    for name, choices, default in (("guidance", GUIDANCE, "random"), ("evasion", EVASION, "flee")):
+        value = message.get(name, default)
+        if value not in choices:
+            raise ValueError(f"{name}: одно из {', '.join(sorted(choices))}")
+        params[name] = value
+    return params
+
+
+def run_chunk(params, index, trials):
+    """Один пакет взаимодействий; вызывается в процессе-исполнителе"""
+    result = run_batch(trials, params["speed_drone_kmh"], params["speed_missile_kmh"],
+                       params["zone_radius_km"],
+                       rng=np.random.default_rng([params["seed"], index]),
+                       max_time=params["max_time"], guidance=params["guidance"],
+                       evasion=params["evasion"])
+    finished = result.finished
+    return {
+        "trials": trials,
+        "finished": int(finished.sum()),
+        "intercepted": int(result.intercepted.sum()),
+        "time": float(result.time[finished].sum()),
+        "drone_distance": float(result.drone_distance[finished].sum()),
+    }
+
+
+class Job:
+    """Расчёт одного набора параметров и журнал его сообщений для подписчиков"""
+
+    def __init__(self):
+        self.messages = []
+        self.done = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, message, last=False):
+        async with self._changed:
+            self.messages.append(message)
+            self.done = last
+            self._changed.notify_all()
+
+    async def follow(self):
+        """Все сообщения расчёта: уже вышедшие сразу, остальные по мере готовности"""
+        i = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: i < len(self.messages))
+                pending = self.messages[i:]
+            for message in pending:
+                yield message
+            i += len(pending)
+            if self.done and i == len(self.messages):
+                return
+
+
+class SimulationServer:
+    """Принимает запросы, раздаёт пакеты пулу процессов и объединяет одинаковые запросы"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.window = 2 * self.workers  # пакетов одного расчёта в пуле одновременно
+        self.executor = self._new_executor()
+        self.jobs = {}  # ключ параметров → Job, пока расчёт идёт
+        self.computed = 0  # запущенных расчётов (без объединённых)
+
+    def _new_executor(self):
+        # spawn, а не fork: процессы пула создаются по мере надобности, и при fork
+        # они унаследовали бы открытые сокеты клиентов — закрытие соединения
+        # сервером тогда не доходило бы до клиента
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, params):
+        """Job для параметров: уже идущий или новый"""
+        key = tuple(sorted(params.items()))
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = Job()
+            self.computed += 1
+            asyncio.get_running_loop().create_task(self._run(key, job, params))
+        return job
+
+    async def _run(self, key, job, params):
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        trials, chunk = params["trials"], params["chunk"]
+        chunks = -(-trials // chunk)
+        totals = {"trials": 0, "finished": 0, "intercepted": 0, "time": 0.0,
+                  "drone_distance": 0.0}
+        running = finished = set()
+        try:
+            submitted = done = 0
+            while done < chunks:
+                # Окно: новые пакеты — по мере готовности прежних
+                while submitted < chunks and len(running) < self.window:
+                    size = min(chunk, trials - submitted * chunk)
+                    running.add(loop.run_in_executor(executor, run_chunk, params,
+                                                     submitted, size))
+                    submitted += 1
+                finished, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    part = future.result()
+                    for name in totals:
+                        totals[name] += part[name]
+                    done += 1
+                    last = done == chunks
+                    await job.publish(self._summary("result" if last else "partial", totals,
+                                                    done, chunks), last)
+        except Exception as e:  # ошибка в процессе-исполнителе или погибший пул
+            for future in running | finished:
+                if future.done() and not future.cancelled():
+                    future.exception()  # прочитано: без предупреждения asyncio
+                else:
+                    future.cancel()
+            if isinstance(e, BrokenProcessPool) and self.executor is executor:
+                self.executor = self._new_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            await job.publish({"type": "error", "error": f"{type(e).__name__}: {e}"}, True)
+        finally:
+            del self.jobs[key]
+
+    @staticmethod
+    def _summary(kind, totals, chunks_done, chunks):
+        finished = totals["finished"]
+        return {
+            "type": kind,
+            "chunks_done": chunks_done,
+            "chunks": chunks,
+            "trials": totals["trials"],
+            "finished": finished,
+            "intercepted": totals["intercepted"],
+            "probability": totals["intercepted"] / finished if finished else None,
+            "mean_time": totals["time"] / finished if finished else None,
+            "mean_drone_distance": totals["drone_distance"] / finished if finished else None,
+        }
+
+    async def handle_client(self, reader, writer):
+        """Соединение: каждая строка — отдельный запрос, ответы помечаются его id"""
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    self._send(writer, {"type": "error", "error": "слишком длинная строка"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def _answer(self, line, writer):
+        request_id = None
+        try:
+            message = json.loads(line)
+            if isinstance(message, dict):
+                request_id = message.get("id")
+            job = self.submit(parse_request(message))
+        except ValueError as e:  # в том числе ошибка разбора JSON
+            self._send(writer, {"id": request_id, "type": "error", "error": str(e)})
+            await writer.drain()
+            return
+
+        async for reply in job.follow():
+            self._send(writer, dict(reply, id=request_id))
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return  # клиент ушёл; расчёт досчитается для остальных подписчиков
+
+    @staticmethod
+    def _send(writer, message):
+        if not writer.is_closing():
+            writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, ready=None):
+        """Слушает TCP (host, port) или Unix-сокет unix_path до отмены"""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, unix_path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        if ready is not None:
+            ready(server)
+
+        # SIGTERM/SIGINT останавливают сервер штатно (на Windows недоступно)
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                pass
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def query(request, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    """Синхронный клиент: отправляет один запрос и отдаёт ответы до итогового"""
+    if unix_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            yield reply
+            if reply["type"] in ("result", "error"):
+                return
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер расчётов симуляции (JSON Lines)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="слушать Unix-сокет вместо TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов (по умолчанию все ядра)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = SimulationServer(args.workers)
+
+    def ready(listener):
+        where = args.unix or ", ".join(
+            f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in listener.sockets)
+        print(f"Сервер слушает {where}", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, ready))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Сервер остановлен")
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
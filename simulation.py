@@ -0,0 +1,330 @@
+"""Ядро симуляции перехвата без pygame: физика дрона и ракеты"""
+import copy
+import hashlib
+import math
+import random
+from collections import namedtuple
+from contextlib import nullcontext
+
+from entities import (FLAG_FINISHED, FLAG_INTERCEPTED, FLAG_MISSILE_ACTIVE,
+                      FLAG_SEGMENT_PREDICTED, Drone, Missile)
+from strategies import make_evasion, make_guidance
+
+# Параметры карты
+WIDTH_KM = 16.0   # ширина карты в км
+HEIGHT_KM = 12.0  # высота карты в км
+
+DT = 0.05                    # шаг симуляции в секундах
+INTERCEPT_DISTANCE_KM = 0.1  # 100 метров — перехват
+BOUNDS_MARGIN_KM = 5.0       # запас за краем карты, после которого ракета ушла
+
+# Допустимые значения параметров (мин, макс)
+DRONE_SPEED_RANGE = (0.1, 200.0)    # км/ч
+MISSILE_SPEED_RANGE = (0.1, 500.0)  # км/ч
+ZONE_RADIUS_RANGE = (0.1, 20.0)     # км
+
+EngagementResult = namedtuple(
+    "EngagementResult",
+    ["intercepted", "time", "drone_distance", "missile_distance"])
+
+
+def derive_seed(master_seed, run_index):
+    """64-битное зерно прогона по главному зерну и номеру прогона"""
+    digest = hashlib.blake2b(f"{master_seed}:{run_index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def make_rng(master_seed, run_index):
+    """Собственный поток случайных чисел для одного прогона"""
+    return random.Random(derive_seed(master_seed, run_index))
+
+
+class Engagement:
+    """
+    Состояние одного боевого взаимодействия дрона и ракеты.
+    guidance и evasion — стратегии из strategies.py (имя или объект);
+    по умолчанию случайные повороты ракеты и бегство дрона прямо от неё.
+    Изменяемое состояние — сущности drone и missile (entities.py) и счётчики
+    ниже; clone() и snapshot()/restore() копируют только их.
+    """
+    __slots__ = ("speed_drone_kmh", "speed_missile_kmh", "zone_radius_km", "rng",
+                 "events", "guidance", "evasion", "speed_drone", "speed_missile",
+                 "drone", "missile", "segment_predicted", "time_elapsed", "steps",
+                 "intercepted", "finished")
+
+    def __init__(self, speed_drone_kmh=80.0, speed_missile_kmh=120.0,
+                 zone_radius_km=3.0, rng=None, record_events=False,
+                 guidance="random", evasion="flee"):
+        self.speed_drone_kmh = speed_drone_kmh
+        self.speed_missile_kmh = speed_missile_kmh
+        self.zone_radius_km = zone_radius_km
+        self.rng = rng = random.Random() if rng is None else rng
+
+        # Журнал событий (time, kind, *values) для воспроизведения
+        self.events = [] if record_events else None
+
+        self.guidance = make_guidance(guidance) if isinstance(guidance, str) else guidance
+        self.evasion = make_evasion(evasion) if isinstance(evasion, str) else evasion
+
+        self.speed_drone = speed_drone_kmh / 3600.0  # км/сек
+        self.speed_missile = speed_missile_kmh / 3600.0  # км/сек
+
+        # Дрон в центре карты (8, 6) км, ракета изначально неактивна
+        self.drone = Drone(WIDTH_KM / 2, HEIGHT_KM / 2)
+        self.missile = Missile(rng.uniform(2, 6))
+        self.segment_predicted = False  # участок уже оценён predictor.skip_segment
+
+        self.time_elapsed = 0.0
+        self.steps = 0  # число шагов интегрирования (включая прыжки)
+        self.intercepted = False
+        self.finished = False
+
+    def clone(self):
+        """
+        Независимая копия со своим потоком случайных чисел в том же
+        состоянии: копия продолжит прогон бит в бит так же, как оригинал.
+        Стратегии без состояния, они общие.
+        """
+        other = Engagement.__new__(Engagement)
+        for name in Engagement.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.rng = copy.copy(self.rng)
+        other.events = None if self.events is None else list(self.events)
+        other.drone = self.drone.copy()
+        other.missile = self.missile.copy()
+        return other
+
+    def snapshot(self):
+        """Изменяемое состояние кортежем в порядке entities.STATE_FIELDS (без rng)"""
+        d, m = self.drone, self.missile
+        flags = ((FLAG_MISSILE_ACTIVE if m.active else 0) |
+                 (FLAG_INTERCEPTED if self.intercepted else 0) |
+                 (FLAG_FINISHED if self.finished else 0) |
+                 (FLAG_SEGMENT_PREDICTED if self.segment_predicted else 0))
+        return (self.time_elapsed, self.steps, d.x, d.y, d.vx, d.vy, d.distance,
+                m.x, m.y, m.angle, m.turn_timer, m.turn_interval, m.distance, flags)
+
+    def restore(self, state):
+        """Возвращает состояние из snapshot() (поток случайных чисел не трогает)"""
+        d, m = self.drone, self.missile
+        (self.time_elapsed, self.steps, d.x, d.y, d.vx, d.vy, d.distance,
+         m.x, m.y, m.angle, m.turn_timer, m.turn_interval, m.distance, flags) = state
+        m.active = bool(flags & FLAG_MISSILE_ACTIVE)
+        self.intercepted = bool(flags & FLAG_INTERCEPTED)
+        self.finished = bool(flags & FLAG_FINISHED)
+        self.segment_predicted = bool(flags & FLAG_SEGMENT_PREDICTED)
+
+    def spawn_missile(self):
+        """Генерация стартовой позиции ракеты на краю карты: (x, y, курс)"""
+        side = self.rng.choice(['top', 'bottom', 'left', 'right'])
+        margin_km = 0.3  # минимальный отступ за край
+
+        if side == 'top':
+            x = self.rng.uniform(1, WIDTH_KM - 1)
+            y = HEIGHT_KM + margin_km
+        elif side == 'bottom':
+            x = self.rng.uniform(1, WIDTH_KM - 1)
+            y = -margin_km
+        elif side == 'left':
+            x = -margin_km
+            y = self.rng.uniform(1, HEIGHT_KM - 1)
+        else:  # right
+            x = WIDTH_KM + margin_km
+            y = self.rng.uniform(1, HEIGHT_KM - 1)
+
+        # Направление на дрон (в центре)
+        angle = math.atan2(self.drone.y - y, self.drone.x - x)
+        return x, y, angle
+
+    def launch(self):
+        """Спавн ракеты и запуск взаимодействия"""
+        m = self.missile
+        m.x, m.y, m.angle = self.spawn_missile()
+        m.active = True
+        self.log("spawn", m.x, m.y, m.angle, m.turn_interval)
+
+    def log(self, kind, *values):
+        """Записывает событие в журнал, если он ведётся"""
+        if self.events is not None:
+            self.events.append((self.time_elapsed, kind) + values)
+
+    def separation(self):
+        """Текущее расстояние между дроном и ракетой, км"""
+        return math.hypot(self.missile.x - self.drone.x, self.missile.y - self.drone.y)
+
+    def step(self, dt=DT):
+        """Один шаг физики; возвращает True, если взаимодействие завершено"""
+        m, d = self.missile, self.drone
+        if not m.active or self.finished:
+            return self.finished
+
+        self.time_elapsed += dt
+        self.steps += 1
+
+        # Маневр ракеты по стратегии наведения
+        self.guidance.steer(self, dt)
+
+        # Движение ракеты
+        dx_m = math.cos(m.angle) * self.speed_missile * dt
+        dy_m = math.sin(m.angle) * self.speed_missile * dt
+        m.x += dx_m
+        m.y += dy_m
+        m.distance += math.hypot(dx_m, dy_m)
+
+        # Расстояние до дрона
+        dist_to_drone = math.hypot(m.x - d.x, m.y - d.y)
+
+        # Движение дрона (уклоняется по стратегии, если ракета в зоне)
+        d.vx = d.vy = 0.0
+        if dist_to_drone <= self.zone_radius_km:
+            if dist_to_drone > 0.01:
+                dir_x, dir_y = self.evasion.direction(self, dist_to_drone)
+                dx_d = dir_x * self.speed_drone * dt
+                dy_d = dir_y * self.speed_drone * dt
+                d.x += dx_d
+                d.y += dy_d
+                d.distance += math.hypot(dx_d, dy_d)
+                d.vx = dir_x * self.speed_drone
+                d.vy = dir_y * self.speed_drone
+
+            # Проверка перехвата
+            if math.hypot(m.x - d.x, m.y - d.y) < INTERCEPT_DISTANCE_KM:
+                self.intercepted = True
+                self.finished = True
+                self.log("intercept", d.x, d.y)
+                return True
+
+        # Проверка: покинула ли ракета зону досягаемости
+        if (m.x < -BOUNDS_MARGIN_KM or m.x > WIDTH_KM + BOUNDS_MARGIN_KM or
+                m.y < -BOUNDS_MARGIN_KM or m.y > HEIGHT_KM + BOUNDS_MARGIN_KM):
+            m.active = False
+            self.finished = True
+            self.log("escape", m.x, m.y)
+
+        return self.finished
+
+    def time_to_next_event(self):
+        """
+        Время (сек) до ближайшего события при прямолинейном полёте ракеты:
+        смена курса, вход в зону обнаружения или выход за границы.
+        Пока ни одно из них не наступило, дрон неподвижен.
+        """
+        m = self.missile
+        vx = math.cos(m.angle) * self.speed_missile
+        vy = math.sin(m.angle) * self.speed_missile
+
+        # Смена курса
+        t_event = m.turn_interval - m.turn_timer
+
+        # Вход в зону: |f + t·v| = R, где f — вектор от дрона к ракете
+        fx = m.x - self.drone.x
+        fy = m.y - self.drone.y
+        f_dot_v = fx * vx + fy * vy
+        c = fx * fx + fy * fy - self.zone_radius_km ** 2
+        if c <= 0:
+            return 0.0  # ракета уже в зоне — дрон убегает
+        v2 = vx * vx + vy * vy
+        disc = f_dot_v * f_dot_v - v2 * c
+        if f_dot_v < 0 and disc >= 0:
+            t_event = min(t_event, (-f_dot_v - math.sqrt(disc)) / v2)
+
+        # Выход за границы зоны досягаемости
+        for pos, v, size in ((m.x, vx, WIDTH_KM), (m.y, vy, HEIGHT_KM)):
+            if v > 0:
+                t_event = min(t_event, (size + BOUNDS_MARGIN_KM - pos) / v)
+            elif v < 0:
+                t_event = min(t_event, (-BOUNDS_MARGIN_KM - pos) / v)
+
+        return max(t_event, 0.0)
+
+    def leap(self, n_steps, dt=DT):
+        """
+        Прыжок на n_steps шагов по прямой без промежуточных шагов.
+        Допустим, только пока не наступило ни одно событие (см. time_to_next_event);
+        прыжок выровнен по сетке dt, поэтому дальнейшие шаги совпадают с фиксированным шагом.
+        """
+        t = n_steps * dt
+        self.time_elapsed += t
+        self.steps += 1
+        m = self.missile
+        m.turn_timer += t
+        m.x += math.cos(m.angle) * self.speed_missile * t
+        m.y += math.sin(m.angle) * self.speed_missile * t
+        m.distance += self.speed_missile * t
+
+    def advance(self, dt=DT, max_steps=None):
+        """
+        Событийный шаг: прыгает до шага перед ближайшим событием,
+        затем делает один обычный шаг. Пока дрон убегает, прыжков нет;
+        при наведении без прямых участков (например, "pn") прыжков нет вовсе.
+        Возвращает True, если взаимодействие завершено.
+        """
+        if not self.missile.active or self.finished:
+            return self.finished
+        if not self.guidance.piecewise_straight:
+            return self.step(dt)
+
+        # Один шаг запаса, чтобы ошибки округления не перескочили событие
+        n_steps = int(self.time_to_next_event() / dt) - 1
+        if max_steps is not None:
+            n_steps = min(n_steps, max_steps - 1)
+        if n_steps > 0:
+            self.leap(n_steps, dt)
+        return self.step(dt)
+
+    def result(self):
+        """Итог взаимодействия"""
+        return EngagementResult(self.intercepted, self.time_elapsed,
+                                self.drone.distance, self.missile.distance)
+
+
+def drive(engagement, dt=DT, max_time=None, integrator="fixed", profiler=None,
+          states=None):
+    """
+    Запускает ракету и ведёт взаимодействие до перехвата или ухода ракеты.
+    integrator="fixed" — шаг dt на всём пути, "event" — прыжки между
+    событиями и мелкие шаги только пока дрон убегает, "predict" — как
+    "event", но погоня на прямом участке по возможности решается
+    аналитически (predictor.skip_segment) вместо шагов.
+    С profiler (profiling.PhaseProfiler) каждый шаг замеряется как фаза "physics".
+    С states (entities.StateStore) снапшот пишется после запуска и после
+    каждого шага (при "event" и "predict" — после каждого прыжка).
+    """
+    if integrator not in ("fixed", "event", "predict"):
+        raise ValueError(f"неизвестный integrator: {integrator!r}")
+    phase = profiler.phase("physics") if profiler is not None else nullcontext()
+    if integrator == "predict":
+        from predictor import skip_segment
+    engagement.launch()
+    if states is not None:
+        states.append(engagement.snapshot())
+    while True:
+        with phase:
+            if integrator in ("event", "predict"):
+                max_steps = None
+                if max_time is not None:
+                    max_steps = int((max_time - engagement.time_elapsed) / dt)
+                done = None
+                if (integrator == "predict" and not engagement.segment_predicted and
+                        engagement.separation() <= engagement.zone_radius_km):
+                    engagement.segment_predicted = True
+                    if skip_segment(engagement, dt, max_steps):
+                        done = engagement.finished
+                if done is None:
+                    done = engagement.advance(dt, max_steps)
+            else:
+                done = engagement.step(dt)
+        if states is not None:
+            states.append(engagement.snapshot())
+        if done or (max_time is not None and engagement.time_elapsed >= max_time):
+            break
+    return engagement.result()
+
+
+def run_engagement(speed_drone_kmh, speed_missile_kmh, zone_radius_km,
+                   rng=None, dt=DT, max_time=None, integrator="fixed",
+                   profiler=None, guidance="random", evasion="flee"):
+    """Прогоняет одно взаимодействие без окна (см. drive)"""
+    engagement = Engagement(speed_drone_kmh, speed_missile_kmh,
+                            zone_radius_km, rng, guidance=guidance, evasion=evasion)
+    return drive(engagement, dt, max_time, integrator, profiler)
@@ -0,0 +1,319 @@
+"""
+Потоковая статистика итогов взаимодействий в постоянной памяти.
+
+RunningStats — число, среднее и дисперсия методом Уэлфорда (пакеты
+сливаются формулой Чана), P2Quantile — оценка квантиля алгоритмом P²
+(Jain, Chlamtac, 1985) по пяти маркерам, wilson_interval — доверительный
+интервал доли по Уилсону. EngagementStats собирает всё это по потоку
+итогов simulation.EngagementResult или пакетов batch.BatchResult и
+говорит, когда интервал для вероятности перехвата уже достаточно узок
+(settled) — по нему sweep.py останавливает ячейку досрочно.
+
+    stats = EngagementStats()
+    for chunk in range(10):
+        stats.add_batch(run_batch(2000, 20, 300, 8.0, rng=rng))
+        if stats.settled(0.01):
+            break
+    print(stats.probability, stats.interval())
+"""
+import math
+
+import numpy as np
+
+Z_95 = 1.959963984540054  # квантиль нормального распределения для 95%
+
+QUANTILES = (0.5, 0.9)   # квантили, которые считает EngagementStats
+MIN_TRIALS = 500         # раньше стольких завершившихся взаимодействий не останавливаться
+
+
+class RunningStats:
+    """Число значений, среднее, дисперсия, минимум и максимум без хранения значений"""
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # сумма квадратов отклонений от среднего
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def add_array(self, values):
+        """Пакет значений (массив NumPy) одной операцией слияния"""
+        if not len(values):
+            return
+        mean = float(values.mean())
+        self._merge(len(values), mean, float(((values - mean) ** 2).sum()),
+                    float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        """Добавляет статистику другого RunningStats (например, из другого процесса)"""
+        if other.count:
+            self._merge(other.count, other.mean, other._m2, other.min, other.max)
+
+    def _merge(self, count, mean, m2, lo, hi):
+        if not self.count:
+            self.count, self.mean, self._m2 = count, mean, m2
+        else:
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean += delta * count / total
+            self._m2 += m2 + delta * delta * self.count * count / total
+            self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    @property
+    def variance(self):
+        """Несмещённая дисперсия (NaN, пока значений меньше двух)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    Оценка квантиля p алгоритмом P²: пять маркеров, сдвигаемых по
+    параболической интерполяции. Пока значений меньше пяти — точный квантиль.
+    Пакет (add_array) ставит маркеры сразу, без прохода по значениям.
+    """
+    __slots__ = ("p", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0]
+        self._increments = [0.0, p / 2, p, (1.0 + p) / 2, 1.0]
+
+    def add(self, x):
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Ячейка k, в которую попало значение; крайние маркеры — минимум и максимум
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self._positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # Средние маркеры сдвигаются на ±1, если отстали от желаемых позиций
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                h = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = h
+                n[i] += d
+
+    def add_array(self, values):
+        """
+        Пакет значений (массив NumPy) без цикла по элементам: маркеры
+        ставятся сразу на желаемые позиции по объединённой функции рангов
+        старых значений и пакета.
+        """
+        head = max(0, min(len(values), 5 - self.count))
+        for x in values[:head].tolist():
+            self.add(x)
+        if head == len(values):
+            return
+        new = np.sort(values[head:])
+        q, n = self._heights, self._positions
+        self.count += len(new)
+
+        # Сколько значений не больше h. У пакета — точно. У старых между
+        # соседними маркерами ранг растёт так же, как доля пакета между ними
+        # (значения одинаково распределены; значение пакета на границе
+        # считается за половину), а где пакета там нет — линейно; ниже
+        # минимума старых значений нет
+        heights = np.unique(np.concatenate((q, new)))
+        below = np.searchsorted(new, heights, side="right")
+        mid = (below + np.searchsorted(new, heights, side="left")) / 2
+        markers, positions = np.array(q), np.array(n, dtype=float)
+        at_markers = np.searchsorted(new, markers, side="right")
+        seg = np.clip(np.searchsorted(markers, heights, side="right") - 1, 0, 3)
+        lo, hi = markers[seg], markers[seg + 1]
+        inside = at_markers[seg + 1] - at_markers[seg]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(inside > 0, (mid - at_markers[seg]) / inside,
+                            (heights - lo) / (hi - lo))
+        old = positions[seg] + np.nan_to_num(np.clip(frac, 0.0, 1.0)) * (
+            positions[seg + 1] - positions[seg])
+        old[heights < markers[0]] = 0.0
+        ranks = old + below
+
+        desired = self._desired
+        for i in range(5):
+            desired[i] += len(new) * self._increments[i]
+        for i in (1, 2, 3):
+            q[i] = float(np.interp(desired[i], ranks, heights))
+            n[i] = desired[i]
+        q[0] = min(q[0], float(new[0]))
+        q[4] = max(q[4], float(new[-1]))
+        n[4] = self.count
+
+    @property
+    def value(self):
+        """Текущая оценка (NaN, пока значений нет)"""
+        q = self._heights
+        if self.count > 5:
+            return q[2]
+        if not q:
+            return math.nan
+        # Точный квантиль с линейной интерполяцией по отсортированным значениям
+        pos = self.p * (len(q) - 1)
+        lo = int(pos)
+        hi = min(lo + 1, len(q) - 1)
+        return q[lo] + (q[hi] - q[lo]) * (pos - lo)
+
+
+class Distribution:
+    """RunningStats и оценки квантилей quantiles для одной величины"""
+    __slots__ = ("stats", "quantiles")
+
+    def __init__(self, quantiles=QUANTILES):
+        self.stats = RunningStats()
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x):
+        self.stats.add(x)
+        for sketch in self.quantiles.values():
+            sketch.add(x)
+
+    def add_array(self, values):
+        self.stats.add_array(values)
+        for sketch in self.quantiles.values():
+            sketch.add_array(values)
+
+    def quantile(self, p):
+        return self.quantiles[p].value
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Доверительный интервал Уилсона для доли successes / n: (нижняя, верхняя)"""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    z2 = z * z
+    denom = 1.0 + z2 / n
+    center = (p + z2 / (2 * n)) / denom
+    half = z * math.sqrt(p * (1.0 - p) / n + z2 / (4.0 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class EngagementStats:
+    """
+    Итоги потока взаимодействий: счётчики, вероятность перехвата с
+    интервалом Уилсона, распределения времени и путей (среднее, разброс,
+    квантили). Время и пути — по завершившимся взаимодействиям, время до
+    перехвата — только по перехваченным. Память не растёт с числом итогов.
+    """
+
+    def __init__(self, quantiles=QUANTILES, z=Z_95):
+        self.z = z
+        self.trials = 0
+        self.finished = 0
+        self.intercepted = 0
+        self.time = Distribution(quantiles)
+        self.intercept_time = Distribution(quantiles)
+        self.drone_distance = Distribution(quantiles)
+        self.missile_distance = Distribution(quantiles)
+
+    def add(self, result, finished=True):
+        """
+        Один итог simulation.EngagementResult. finished=False — прогон
+        остановлен по max_time: он учитывается только в trials.
+        """
+        self.trials += 1
+        if not finished:
+            return
+        self.finished += 1
+        self.time.add(result.time)
+        self.drone_distance.add(result.drone_distance)
+        self.missile_distance.add(result.missile_distance)
+        if result.intercepted:
+            self.intercepted += 1
+            self.intercept_time.add(result.time)
+
+    def add_batch(self, result):
+        """Пакет batch.BatchResult (незавершившиеся строки — только в trials)"""
+        finished = result.finished
+        intercepted = result.intercepted & finished
+        self.trials += len(result)
+        self.finished += int(finished.sum())
+        self.intercepted += int(intercepted.sum())
+        self.time.add_array(result.time[finished])
+        self.drone_distance.add_array(result.drone_distance[finished])
+        self.missile_distance.add_array(result.missile_distance[finished])
+        self.intercept_time.add_array(result.time[intercepted])
+
+    @property
+    def probability(self):
+        """Доля перехватов среди завершившихся (NaN, пока их нет)"""
+        return self.intercepted / self.finished if self.finished else math.nan
+
+    def interval(self):
+        """Интервал Уилсона для вероятности перехвата"""
+        return wilson_interval(self.intercepted, self.finished, self.z)
+
+    @property
+    def half_width(self):
+        lo, hi = self.interval()
+        return (hi - lo) / 2
+
+    def settled(self, tolerance, min_trials=MIN_TRIALS):
+        """
+        Полуширина интервала не больше tolerance и итогов не меньше min_trials.
+        Если спрашивать после каждого пакета, интервал у остановленного потока
+        накрывает вероятность чуть реже номинальных 95% (см. sweep.py).
+        """
+        return self.finished >= min_trials and self.half_width <= tolerance
+
+    def summary(self):
+        """Плоский словарь итогов (для строк CSV и JSON)"""
+        lo, hi = self.interval()
+        row = {
+            "trials": self.trials,
+            "finished": self.finished,
+            "intercepted": self.intercepted,
+            "probability": self.probability,
+            "ci_low": lo,
+            "ci_high": hi,
+        }
+        for name in ("time", "intercept_time", "drone_distance", "missile_distance"):
+            dist = getattr(self, name)
+            row[f"mean_{name}"] = dist.stats.mean if dist.stats.count else math.nan
+            row[f"std_{name}"] = dist.stats.std
+            for p in dist.quantiles:
+                row[f"p{round(p * 100)}_{name}"] = dist.quantile(p)
+        return row
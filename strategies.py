@@ -0,0 +1,161 @@
+"""
+Стратегии наведения ракеты и уклонения дрона.
+
+У каждой стратегии две формы: скалярная для simulation.Engagement
+(steer / direction) и векторная для batch.BatchEngine (steer_batch /
+direction_batch), которая обрабатывает все строки пакета без вызовов
+Python на объект. Векторные ядра лежат в strategy_kernels.py и
+импортируются только векторными формами, так что скалярному ядру
+NumPy не нужен.
+
+Наведение:
+    random — случайные повороты ±30° через 2–6 с (исходное поведение)
+    pn     — пропорциональная навигация: скорость поворота = N · скорость линии визирования
+Уклонение (пока ракета в зоне обнаружения):
+    flee   — прямо от ракеты (исходное поведение)
+    break  — перпендикулярно курсу ракеты, в сторону, где дрон уже находится
+    zigzag — от ракеты с отклонением ±угол, сторона меняется каждые period секунд
+"""
+import math
+
+
+class RandomTurns:
+    """Случайные повороты ±30° через случайные интервалы 2–6 с"""
+    name = "random"
+    piecewise_straight = True  # между поворотами курс постоянен (для прыжков и predictor)
+
+    def steer(self, e, dt):
+        m = e.missile
+        m.turn_timer += dt
+        if m.turn_timer >= m.turn_interval:
+            turn = e.rng.uniform(-math.pi / 6, math.pi / 6)  # ±30 градусов
+            m.angle += turn
+            m.turn_timer = 0.0
+            m.turn_interval = e.rng.uniform(2, 6)
+            e.segment_predicted = False
+            e.log("turn", m.angle, m.turn_interval)
+
+    def steer_batch(self, b, dt):
+        import numpy as np
+
+        b.timer += dt
+        turn = np.flatnonzero(b.timer >= b.interval)
+        if len(turn):
+            angle = b.angle[turn] + b.rng.uniform(-math.pi / 6, math.pi / 6, len(turn))
+            b.angle[turn] = angle
+            b.vx[turn] = np.cos(angle) * b.speed_missile
+            b.vy[turn] = np.sin(angle) * b.speed_missile
+            b.timer[turn] = 0
+            b.interval[turn] = b.rng.uniform(2, 6, len(turn))
+            b.segment_predicted[turn] = False
+
+
+class ProportionalNavigation:
+    """
+    Пропорциональная навигация: ракета видит дрон всегда и поворачивает
+    со скоростью gain · dλ/dt, где λ — угол линии визирования, не быстрее
+    max_turn_rate (рад/с).
+    """
+    name = "pn"
+    piecewise_straight = False
+
+    def __init__(self, gain=3.0, max_turn_rate=math.radians(30)):
+        self.gain = gain
+        self.max_turn_rate = max_turn_rate
+
+    def steer(self, e, dt):
+        d, m = e.drone, e.missile
+        rx = d.x - m.x
+        ry = d.y - m.y
+        vrx = d.vx - math.cos(m.angle) * e.speed_missile
+        vry = d.vy - math.sin(m.angle) * e.speed_missile
+        r2 = max(rx * rx + ry * ry, 1e-12)
+        rate = self.gain * (rx * vry - ry * vrx) / r2
+        m.angle += min(max(rate, -self.max_turn_rate), self.max_turn_rate) * dt
+
+    def steer_batch(self, b, dt):
+        import numpy as np
+
+        from strategy_kernels import pn_turn
+
+        b.angle += pn_turn(b.drone_x - b.missile_x, b.drone_y - b.missile_y,
+                           b.drone_vx - b.vx, b.drone_vy - b.vy,
+                           self.gain, self.max_turn_rate, dt)
+        b.vx = np.cos(b.angle) * b.speed_missile
+        b.vy = np.sin(b.angle) * b.speed_missile
+
+
+class Flee:
+    """Дрон убегает прямо от ракеты"""
+    name = "flee"
+    radial = True  # движение строго от ракеты (на этом построен predictor)
+
+    def direction(self, e, dist):
+        return (e.drone.x - e.missile.x) / dist, (e.drone.y - e.missile.y) / dist
+
+    def direction_batch(self, b, rows, rx, ry, dist):
+        return rx / dist, ry / dist
+
+
+class PerpendicularBreak:
+    """Дрон уходит поперёк курса ракеты, на ту сторону, где он уже находится"""
+    name = "break"
+    radial = False
+
+    def direction(self, e, dist):
+        ux, uy = math.cos(e.missile.angle), math.sin(e.missile.angle)
+        rx = e.drone.x - e.missile.x
+        ry = e.drone.y - e.missile.y
+        side = 1.0 if ux * ry - uy * rx >= 0 else -1.0
+        return -uy * side, ux * side
+
+    def direction_batch(self, b, rows, rx, ry, dist):
+        import numpy as np
+
+        from strategy_kernels import break_direction
+
+        angle = b.angle[rows]
+        return break_direction(rx, ry, np.cos(angle), np.sin(angle))
+
+
+class Zigzag:
+    """Дрон убегает от ракеты, отклоняясь на ±angle; сторона меняется каждые period с"""
+    name = "zigzag"
+    radial = False
+
+    def __init__(self, period=1.5, angle=math.radians(45)):
+        self.period = period
+        self.cos_a = math.cos(angle)
+        self.sin_a = math.sin(angle)
+
+    def _sign(self, time_elapsed):
+        return 1.0 if int(time_elapsed / self.period) % 2 == 0 else -1.0
+
+    def direction(self, e, dist):
+        fx = (e.drone.x - e.missile.x) / dist
+        fy = (e.drone.y - e.missile.y) / dist
+        s = self.sin_a * self._sign(e.time_elapsed)
+        return fx * self.cos_a - fy * s, fx * s + fy * self.cos_a
+
+    def direction_batch(self, b, rows, rx, ry, dist):
+        import numpy as np
+
+        from strategy_kernels import zigzag_direction
+
+        # У строк пакета свои часы, поэтому и сторона своя
+        sign = np.where(np.floor(b.clock[rows] / self.period) % 2 == 0, 1.0, -1.0)
+        return zigzag_direction(rx, ry, dist, sign, self.cos_a, self.sin_a)
+
+
+GUIDANCE = {cls.name: cls for cls in (RandomTurns, ProportionalNavigation)}
+EVASION = {cls.name: cls for cls in (Flee, PerpendicularBreak, Zigzag)}
+
+
+def make_guidance(name="random"):
+    """Стратегия наведения по имени из GUIDANCE"""
+    return GUIDANCE[name]()
+
+
+def make_evasion(name="flee"):
+    """Стратегия уклонения по имени из EVASION"""
+    return EVASION[name]()
@@ -0,0 +1,41 @@
+"""
+Векторные ядра стратегий из strategies.py.
+
+Ядра компилируются Numba, если она установлена; без неё это обычные
+выражения NumPy с тем же результатом.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _kernel(func):
+    """Компилирует векторное ядро Numba, если она есть"""
+    return njit(cache=True)(func) if njit is not None else func
+
+
+@_kernel
+def pn_turn(rx, ry, vrx, vry, gain, max_rate, dt):
+    """Поворот курса за шаг: N · dλ/dt, ограниченный max_rate (рад/с)"""
+    r2 = np.maximum(rx * rx + ry * ry, 1e-12)
+    rate = gain * (rx * vry - ry * vrx) / r2
+    return np.minimum(np.maximum(rate, -max_rate), max_rate) * dt
+
+
+@_kernel
+def break_direction(rx, ry, ux, uy):
+    """Единичный вектор поперёк курса ракеты (ux, uy) на стороне дрона (rx, ry)"""
+    side = np.where(ux * ry - uy * rx >= 0.0, 1.0, -1.0)
+    return -uy * side, ux * side
+
+
+@_kernel
+def zigzag_direction(rx, ry, dist, sign, cos_a, sin_a):
+    """Направление от ракеты, повёрнутое на ±угол (sign = ±1)"""
+    fx = rx / dist
+    fy = ry / dist
+    s = sin_a * sign
+    return fx * cos_a - fy * s, fx * s + fy * cos_a
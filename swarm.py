@@ -0,0 +1,262 @@
+"""
+Сценарии массированной атаки: много ракет и много дронов на одной карте.
+
+Поиск соседей идёт через равномерную сетку (UniformGrid), поэтому проверки
+обнаружения и перехвата на шаге растут почти линейно по числу объектов,
+а не как ракеты × дроны.
+"""
+import math
+import random
+from collections import namedtuple
+
+from simulation import (WIDTH_KM, HEIGHT_KM, DT, INTERCEPT_DISTANCE_KM,
+                        BOUNDS_MARGIN_KM)
+
+SwarmResult = namedtuple(
+    "SwarmResult",
+    ["time", "drones_lost", "missiles_intercepted", "missiles_escaped",
+     "drone_distance", "missile_distance"])
+
+
+class UniformGrid:
+    """Равномерная сетка по карте в км: ячейка → список (объект, x, y)"""
+
+    def __init__(self, cell_km):
+        self.cell_km = cell_km
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, item, x, y):
+        key = (int(math.floor(x / self.cell_km)), int(math.floor(y / self.cell_km)))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [(item, x, y)]
+        else:
+            bucket.append((item, x, y))
+
+    def query(self, x, y, radius):
+        """Объекты не дальше radius от точки: список (объект, расстояние)"""
+        c = self.cell_km
+        x0, x1 = int(math.floor((x - radius) / c)), int(math.floor((x + radius) / c))
+        y0, y1 = int(math.floor((y - radius) / c)), int(math.floor((y + radius) / c))
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for item, ix, iy in self.cells.get((cx, cy), ()):
+                    dist = math.hypot(ix - x, iy - y)
+                    if dist <= radius:
+                        found.append((item, dist))
+        return found
+
+    def query_rect(self, x0, y0, x1, y1):
+        """
+        Объекты в прямоугольнике [x0, x1] × [y0, y1]. Перебираются ячейки
+        прямоугольника или занятые ячейки — чего меньше, поэтому запрос
+        при взгляде на всю большую карту не дороже числа объектов.
+        """
+        c = self.cell_km
+        i0, i1 = int(math.floor(x0 / c)), int(math.floor(x1 / c))
+        j0, j1 = int(math.floor(y0 / c)), int(math.floor(y1 / c))
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self.cells):
+            buckets = (self.cells.get((i, j), ()) for i in range(i0, i1 + 1)
+                       for j in range(j0, j1 + 1))
+        else:
+            buckets = (bucket for (i, j), bucket in self.cells.items()
+                       if i0 <= i <= i1 and j0 <= j <= j1)
+        return [item for bucket in buckets for item, x, y in bucket
+                if x0 <= x <= x1 and y0 <= y <= y1]
+
+    def nearest(self, x, y, radius):
+        """Ближайший объект в пределах radius: (объект, расстояние) или (None, inf)"""
+        best, best_dist = None, math.inf
+        for item, dist in self.query(x, y, radius):
+            if dist < best_dist:
+                best, best_dist = item, dist
+        return best, best_dist
+
+
+class SwarmDrone:
+    """Дрон в массированном сценарии"""
+    __slots__ = ("pos", "distance", "alive")
+
+    def __init__(self, x, y):
+        self.pos = [x, y]
+        self.distance = 0.0
+        self.alive = True
+
+
+class SwarmMissile:
+    """Ракета в массированном сценарии"""
+    __slots__ = ("pos", "angle", "timer", "interval", "distance", "active")
+
+    def __init__(self, pos, angle, interval):
+        self.pos = pos
+        self.angle = angle
+        self.timer = 0.0
+        self.interval = interval
+        self.distance = 0.0
+        self.active = True
+
+
+class SwarmEngagement:
+    """
+    n_missiles ракет против n_drones дронов. Каждая ракета стартует с края
+    карты курсом на случайный дрон и маневрирует как в simulation.Engagement.
+    Каждый дрон убегает от ближайшей ракеты внутри своей зоны обнаружения;
+    пара ближе 100 м — перехват, оба объекта выбывают. Размер карты
+    width_km × height_km (по умолчанию как в simulation).
+    """
+
+    def __init__(self, n_missiles, n_drones, speed_drone_kmh=80.0,
+                 speed_missile_kmh=120.0, zone_radius_km=3.0, rng=None,
+                 width_km=WIDTH_KM, height_km=HEIGHT_KM):
+        self.rng = rng = random.Random() if rng is None else rng
+        self.width_km = width_km
+        self.height_km = height_km
+        self.speed_drone = speed_drone_kmh / 3600.0  # км/сек
+        self.speed_missile = speed_missile_kmh / 3600.0  # км/сек
+        self.zone_radius_km = zone_radius_km
+
+        # Дроны во внутренней части карты
+        self.drones = [
+            SwarmDrone(rng.uniform(2, width_km - 2), rng.uniform(2, height_km - 2))
+            for _ in range(n_drones)
+        ]
+        self.missiles = [self.spawn_missile() for _ in range(n_missiles)]
+
+        # Ячейка сетки ракет — радиус зоны, чтобы запрос смотрел 3×3 ячейки
+        self.missile_grid = UniformGrid(max(zone_radius_km, INTERCEPT_DISTANCE_KM))
+        self.drone_grid = UniformGrid(max(4 * INTERCEPT_DISTANCE_KM, 0.5))
+        for missile in self.missiles:  # до первого шага — для visible()
+            self.missile_grid.insert(missile, missile.pos[0], missile.pos[1])
+        for drone in self.drones:
+            self.drone_grid.insert(drone, drone.pos[0], drone.pos[1])
+
+        self.time_elapsed = 0.0
+        self.drones_lost = 0
+        self.missiles_intercepted = 0
+        self.missiles_escaped = 0
+        self.finished = not self.missiles or not self.drones
+
+    def spawn_missile(self):
+        """Ракета на случайном краю карты курсом на случайный дрон"""
+        rng = self.rng
+        side = rng.choice(['top', 'bottom', 'left', 'right'])
+        margin_km = 0.3  # минимальный отступ за край
+
+        width_km, height_km = self.width_km, self.height_km
+        if side == 'top':
+            x, y = rng.uniform(1, width_km - 1), height_km + margin_km
+        elif side == 'bottom':
+            x, y = rng.uniform(1, width_km - 1), -margin_km
+        elif side == 'left':
+            x, y = -margin_km, rng.uniform(1, height_km - 1)
+        else:  # right
+            x, y = width_km + margin_km, rng.uniform(1, height_km - 1)
+
+        if self.drones:
+            target = rng.choice(self.drones)
+            angle = math.atan2(target.pos[1] - y, target.pos[0] - x)
+        else:
+            angle = math.atan2(height_km / 2 - y, width_km / 2 - x)
+        return SwarmMissile([x, y], angle, rng.uniform(2, 6))
+
+    def step(self, dt=DT):
+        """Один шаг физики; возвращает True, когда сценарий завершён"""
+        if self.finished:
+            return True
+        self.time_elapsed += dt
+        rng = self.rng
+
+        # Ракеты: случайные маневры и движение
+        self.missile_grid.clear()
+        for missile in self.missiles:
+            if not missile.active:
+                continue
+            missile.timer += dt
+            if missile.timer >= missile.interval:
+                missile.angle += rng.uniform(-math.pi / 6, math.pi / 6)  # ±30 градусов
+                missile.timer = 0
+                missile.interval = rng.uniform(2, 6)
+            step_km = self.speed_missile * dt
+            missile.pos[0] += math.cos(missile.angle) * step_km
+            missile.pos[1] += math.sin(missile.angle) * step_km
+            missile.distance += step_km
+            self.missile_grid.insert(missile, missile.pos[0], missile.pos[1])
+
+        # Дроны убегают от ближайшей ракеты в своей зоне
+        self.drone_grid.clear()
+        for drone in self.drones:
+            if not drone.alive:
+                continue
+            threat, dist = self.missile_grid.nearest(
+                drone.pos[0], drone.pos[1], self.zone_radius_km)
+            if threat is not None and dist > 0.01:
+                step_km = self.speed_drone * dt
+                drone.pos[0] += (drone.pos[0] - threat.pos[0]) / dist * step_km
+                drone.pos[1] += (drone.pos[1] - threat.pos[1]) / dist * step_km
+                drone.distance += step_km
+            self.drone_grid.insert(drone, drone.pos[0], drone.pos[1])
+
+        # Перехват: каждая ракета проверяет только дронов в соседних ячейках
+        for missile in self.missiles:
+            if not missile.active:
+                continue
+            target, target_dist = None, math.inf
+            for drone, dist in self.drone_grid.query(
+                    missile.pos[0], missile.pos[1], INTERCEPT_DISTANCE_KM):
+                if drone.alive and dist < target_dist:
+                    target, target_dist = drone, dist
+            if target_dist < INTERCEPT_DISTANCE_KM:
+                target.alive = False
+                missile.active = False
+                self.drones_lost += 1
+                self.missiles_intercepted += 1
+                continue
+
+            # Проверка: покинула ли ракета зону досягаемости
+            if (missile.pos[0] < -BOUNDS_MARGIN_KM or
+                    missile.pos[0] > self.width_km + BOUNDS_MARGIN_KM or
+                    missile.pos[1] < -BOUNDS_MARGIN_KM or
+                    missile.pos[1] > self.height_km + BOUNDS_MARGIN_KM):
+                missile.active = False
+                self.missiles_escaped += 1
+
+        active = self.missiles_intercepted + self.missiles_escaped < len(self.missiles)
+        self.finished = not active or self.drones_lost == len(self.drones)
+        return self.finished
+
+    def visible(self, x0, y0, x1, y1):
+        """
+        Активные ракеты и живые дроны в прямоугольнике карты по сеткам
+        последнего шага: (ракеты, дроны). Дроны берутся с запасом на радиус
+        зоны, чтобы были видны и зоны дронов за краем прямоугольника.
+        """
+        r = self.zone_radius_km
+        missiles = [m for m in self.missile_grid.query_rect(x0, y0, x1, y1) if m.active]
+        drones = [d for d in self.drone_grid.query_rect(x0 - r, y0 - r, x1 + r, y1 + r)
+                  if d.alive]
+        return missiles, drones
+
+    def result(self):
+        """Итог сценария"""
+        return SwarmResult(
+            self.time_elapsed, self.drones_lost, self.missiles_intercepted,
+            self.missiles_escaped,
+            sum(drone.distance for drone in self.drones),
+            sum(missile.distance for missile in self.missiles))
+
+
+def run_swarm(n_missiles, n_drones, speed_drone_kmh, speed_missile_kmh,
+              zone_radius_km, rng=None, dt=DT, max_time=None,
+              width_km=WIDTH_KM, height_km=HEIGHT_KM):
+    """Прогоняет массированный сценарий без окна"""
+    swarm = SwarmEngagement(n_missiles, n_drones, speed_drone_kmh,
+                            speed_missile_kmh, zone_radius_km, rng,
+                            width_km, height_km)
+    while not swarm.step(dt):
+        if max_time is not None and swarm.time_elapsed >= max_time:
+            break
+    return swarm.result()
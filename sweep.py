@@ -0,0 +1,356 @@
+"""
+Перебор параметров: сетка (скорость дрона, скорость ракеты, радиус зоны).
+
+Каждая ячейка сетки прогоняется пакетом из batch.py в отдельном процессе.
+Результаты пишутся по мере готовности ячеек; прерванный перебор при
+повторном запуске продолжается с ещё не посчитанных ячеек. Описание
+перебора (оси, зерно, число взаимодействий, остановка) лежит рядом с
+результатами (spec_path), и продолжить в тот же файл перебор с другим
+описанием нельзя — иначе в файле смешались бы разные сетки.
+
+С --tolerance ячейка считается пакетами по --chunk взаимодействий и
+останавливается, как только 95% интервал Уилсона для вероятности
+перехвата уже не шире ±tolerance (stats.EngagementStats); --trials
+тогда — верхний предел. Интервал проверяется после каждого пакета, и
+это не учитывается в его ширине: строгих 95% у остановленной ячейки
+нет. Остановка зависит от ширины интервала, а не от оценки, поэтому
+потеря невелика — в моделировании с пакетами по 2000 интервал накрывает
+истинную вероятность в 94–97% ячеек.
+
+    python sweep.py --drone-speed 20 200 10 --missile-speed 50 500 10 \\
+                    --zone-radius 1 10 10 --trials 10000 --output sweep.csv
+    python sweep.py ... --trials 100000 --tolerance 0.005
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch import run_batch
+from simulation import DRONE_SPEED_RANGE, MISSILE_SPEED_RANGE, ZONE_RADIUS_RANGE
+from stats import MIN_TRIALS, EngagementStats
+
+FIELDS = [
+    "i", "j", "k",
+    "speed_drone_kmh", "speed_missile_kmh", "zone_radius_km",
+    "seed", "trials", "finished", "intercepted", "probability",
+    "mean_time", "mean_drone_distance", "mean_missile_distance",
+    "ci_low", "ci_high", "std_time", "p50_time", "p90_time",
+    "mean_intercept_time", "p50_intercept_time", "p90_intercept_time",
+    "p50_drone_distance", "p90_drone_distance",
+    "p50_missile_distance", "p90_missile_distance",
+]
+
+CHUNK_TRIALS = 2000  # взаимодействий в пакете при досрочной остановке
+
+
+def cell_seed(master_seed, i, j, k):
+    """Детерминированное зерно ячейки по главному зерну и её индексам"""
+    return int(np.random.SeedSequence([master_seed, i, j, k]).generate_state(1)[0])
+
+
+def run_cell(cell, trials, seed, max_time=None, tolerance=None, chunk=CHUNK_TRIALS,
+             min_trials=MIN_TRIALS):
+    """
+    Прогоняет одну ячейку сетки; вызывается в процессе-исполнителе.
+    Без tolerance — один пакет из trials взаимодействий, иначе пакеты
+    по chunk до stats.EngagementStats.settled(tolerance, min_trials).
+    """
+    (i, j, k), (drone_kmh, missile_kmh, zone_km) = cell
+    rng = np.random.default_rng(seed)
+    stats = EngagementStats()
+    step = trials if tolerance is None else chunk
+    while stats.trials < trials:
+        stats.add_batch(run_batch(min(step, trials - stats.trials), drone_kmh, missile_kmh,
+                                  zone_km, rng=rng, max_time=max_time))
+        if tolerance is not None and stats.settled(tolerance, min_trials):
+            break
+
+    row = {
+        "i": i, "j": j, "k": k,
+        "speed_drone_kmh": drone_kmh,
+        "speed_missile_kmh": missile_kmh,
+        "zone_radius_km": zone_km,
+        "seed": seed,
+    }
+    summary = stats.summary()
+    row.update((name, summary[name]) for name in FIELDS if name in summary)
+    return row
+
+
+def cell_params(row):
+    """Параметры посчитанной ячейки (дрон, ракета, зона, зерно) — для сверки при продолжении"""
+    return (float(row["speed_drone_kmh"]), float(row["speed_missile_kmh"]),
+            float(row["zone_radius_km"]), int(row["seed"]))
+
+
+def sweep_spec(axes, trials, master_seed=0, max_time=None, tolerance=None,
+               chunk=CHUNK_TRIALS, min_trials=MIN_TRIALS):
+    """Описание перебора, от которого зависят строки результатов"""
+    spec = {"axes": [list(axis) for axis in axes], "trials": trials, "seed": master_seed,
+            "max_time": max_time, "tolerance": tolerance}
+    if tolerance is not None:
+        spec.update(chunk=chunk, min_trials=min_trials)
+    return spec
+
+
+def spec_path(path, fmt="csv"):
+    """
+    Файл описания перебора: рядом с CSV или внутри каталога Parquet
+    (имя с «_» читатели наборов данных pyarrow пропускают)
+    """
+    if fmt == "parquet":
+        return os.path.join(path, "_spec.json")
+    return os.path.splitext(path)[0] + ".spec.json"
+
+
+def _other_grid(key, params):
+    return ValueError(f"ячейка {key} уже посчитана для других параметров "
+                      f"(дрон, ракета, зона, зерно = {params}); укажите другой --output")
+
+
+def check_done(done, spec):
+    """ValueError, если посчитанная ячейка из done не принадлежит перебору spec"""
+    axes = spec["axes"]
+    for key, params in done.items():
+        if not all(index < len(axis) for index, axis in zip(key, axes)):
+            expected = None
+        else:
+            expected = (*(axis[index] for index, axis in zip(key, axes)),
+                        cell_seed(spec["seed"], *key))
+        if params != expected:
+            raise _other_grid(key, params)
+
+
+def check_spec(path, spec, done=None):
+    """
+    Сверяет описание перебора с сохранённым в path (ValueError при
+    расхождении). Если файла ещё нет (новый перебор или результаты
+    прежней версии), сверяет с описанием уже посчитанные ячейки done
+    и сохраняет его.
+    """
+    spec = json.loads(json.dumps(spec))  # как после чтения из файла
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)
+        changed = sorted(name for name in spec.keys() | stored.keys()
+                         if spec.get(name) != stored.get(name))
+        if changed:
+            raise ValueError(f"результаты в этом файле посчитаны для другого перебора "
+                             f"(отличаются: {', '.join(changed)}; см. {path}); "
+                             f"укажите другой --output")
+        return
+    check_done(done or {}, spec)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(spec, f, indent=2)
+    os.replace(tmp, path)
+
+
+class CsvSink:
+    """
+    Дописывает строки в CSV и сбрасывает их на диск после каждой ячейки.
+    done — посчитанные ячейки: индексы → cell_params.
+    """
+
+    def __init__(self, path, spec=None):
+        self.path = path
+        self.done = {}
+
+        if os.path.exists(path):
+            self._truncate_partial_line()
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    self.done[int(row["i"]), int(row["j"]), int(row["k"])] = cell_params(row)
+        if spec is not None:
+            check_spec(spec_path(path), spec, self.done)
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        fields = FIELDS
+        if not new_file:
+            with open(path, newline="") as f:
+                fields = next(csv.reader(f))  # файл прежней версии — её столбцы
+        self.file = open(path, "a", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=fields, extrasaction="ignore")
+        if new_file:
+            self.writer.writeheader()
+            self.file.flush()
+
+    def _truncate_partial_line(self):
+        """Отрезает недописанную строку, оставшуюся после аварийного останова"""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Пишет каждую ячейку отдельным файлом в каталог (набор данных Parquet)"""
+
+    def __init__(self, path, spec=None):
+        import pyarrow.parquet as pq  # опциональная зависимость
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.done = {}
+        for name in os.listdir(path):
+            if name.startswith("cell_") and name.endswith(".parquet"):
+                i, j, k = name[len("cell_"):-len(".parquet")].split("_")
+                row = pq.read_table(os.path.join(path, name)).to_pylist()[0]
+                self.done[int(i), int(j), int(k)] = cell_params(row)
+        if spec is not None:
+            check_spec(spec_path(path, "parquet"), spec, self.done)
+
+    def write(self, row):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        name = f"cell_{row['i']}_{row['j']}_{row['k']}.parquet"
+        tmp = os.path.join(self.path, name + ".tmp")
+        pq.write_table(pa.Table.from_pylist([row]), tmp)
+        os.replace(tmp, os.path.join(self.path, name))  # атомарно
+
+    def close(self):
+        pass
+
+
+def grid_axis(spec, bounds, name):
+    """Значения по одной оси: MIN MAX COUNT в пределах допустимых границ"""
+    lo, hi, count = spec
+    count = int(count)
+    if count < 1 or lo > hi:
+        raise ValueError(f"{name}: неверный диапазон {lo}..{hi} ({count})")
+    if lo < bounds[0] or hi > bounds[1]:
+        raise ValueError(f"{name}: значения должны быть в пределах {bounds[0]}..{bounds[1]}")
+    return [float(v) for v in np.linspace(lo, hi, count)]
+
+
+def build_grid(drone_axis, missile_axis, zone_axis):
+    """Список ячеек ((i, j, k), (дрон, ракета, зона))"""
+    return [
+        ((i, j, k), (d, m, z))
+        for (i, d), (j, m), (k, z) in itertools.product(
+            enumerate(drone_axis), enumerate(missile_axis), enumerate(zone_axis))
+    ]
+
+
+def run_sweep(cells, sink, trials, master_seed=0, workers=None, max_time=None,
+              progress=None, tolerance=None, chunk=CHUNK_TRIALS, min_trials=MIN_TRIALS):
+    """
+    Распределяет ещё не посчитанные ячейки по процессам и пишет итоги
+    (tolerance, chunk, min_trials — досрочная остановка, см. run_cell).
+    Ячейка в sink.done с другими параметрами или зерном — ValueError:
+    в sink лежат результаты другой сетки.
+    """
+    pending = []
+    for key, params in cells:
+        done = sink.done.get(key)
+        if done is None:
+            pending.append((key, params))
+        elif done != (*params, cell_seed(master_seed, *key)):
+            raise _other_grid(key, done)
+    if not pending:
+        return 0
+
+    executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    written = 0
+    try:
+        futures = [
+            executor.submit(run_cell, cell, trials, cell_seed(master_seed, *cell[0]), max_time,
+                            tolerance, chunk, min_trials)
+            for cell in pending
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            sink.write(row)
+            sink.done[row["i"], row["j"], row["k"]] = cell_params(row)
+            written += 1
+            if progress:
+                progress(written, len(pending), row)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Перебор параметров симуляции перехвата")
+    parser.add_argument("--drone-speed", nargs=3, type=float, required=True,
+                        metavar=("MIN", "MAX", "N"), help="скорость дрона, км/ч")
+    parser.add_argument("--missile-speed", nargs=3, type=float, required=True,
+                        metavar=("MIN", "MAX", "N"), help="скорость ракеты, км/ч")
+    parser.add_argument("--zone-radius", nargs=3, type=float, required=True,
+                        metavar=("MIN", "MAX", "N"), help="радиус зоны, км")
+    parser.add_argument("--trials", type=int, default=10000,
+                        help="число взаимодействий на ячейку")
+    parser.add_argument("--seed", type=int, default=0, help="главное зерно")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов (по умолчанию все ядра)")
+    parser.add_argument("--max-time", type=float, default=None,
+                        help="предел симулируемого времени на взаимодействие, сек")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="остановить ячейку, когда 95%% интервал вероятности "
+                             "перехвата не шире ±tolerance (проверяется после "
+                             "каждого пакета, так что покрытие чуть ниже 95%%)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_TRIALS,
+                        help="взаимодействий в пакете при --tolerance")
+    parser.add_argument("--min-trials", type=int, default=MIN_TRIALS,
+                        help="не останавливать раньше стольких завершившихся взаимодействий")
+    parser.add_argument("--output", default="sweep.csv",
+                        help="файл CSV или каталог Parquet")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        axes = (
+            grid_axis(args.drone_speed, DRONE_SPEED_RANGE, "--drone-speed"),
+            grid_axis(args.missile_speed, MISSILE_SPEED_RANGE, "--missile-speed"),
+            grid_axis(args.zone_radius, ZONE_RADIUS_RANGE, "--zone-radius"),
+        )
+        cells = build_grid(*axes)
+        spec = sweep_spec(axes, args.trials, args.seed, args.max_time, args.tolerance,
+                          args.chunk, args.min_trials)
+        sink = (CsvSink if args.format == "csv" else ParquetSink)(args.output, spec)
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+
+    print(f"Ячеек: {len(cells)}, уже посчитано: {len(sink.done.keys() & {c[0] for c in cells})}")
+
+    def progress(done, total, row):
+        print(f"[{done}/{total}] дрон {row['speed_drone_kmh']:.1f} км/ч, "
+              f"ракета {row['speed_missile_kmh']:.1f} км/ч, "
+              f"зона {row['zone_radius_km']:.2f} км → P = {row['probability']:.4f} "
+              f"[{row['ci_low']:.4f}; {row['ci_high']:.4f}], взаимодействий {row['trials']}")
+
+    try:
+        run_sweep(cells, sink, args.trials, args.seed, args.workers,
+                  args.max_time, progress, args.tolerance, args.chunk, args.min_trials)
+    except KeyboardInterrupt:
+        print("\nПрервано; повторный запуск продолжит с оставшихся ячеек")
+        return 130
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    finally:
+        sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Согласие интеграторов и воспроизводимость прогонов.
+
+"event" и "predict" должны давать те же итоги, что и шаг "fixed": у одного
+прогона — тот же исход и время с точностью до шага dt, у пакета — ту же
+вероятность перехвата в пределах статистической погрешности.
+
+    python -m pytest -q
+"""
+import copy
+import math
+
+import numpy as np
+import pytest
+
+import replay
+from batch import BatchEngine, run_batch
+from predictor import skip_segments_batch
+from simulation import DT, make_rng, run_engagement
+
+MAX_TIME = 1800.0
+INTEGRATORS = ("fixed", "event", "predict")
+
+# (дрон км/ч, ракета км/ч, зона км), наведение, уклонение, номера прогонов.
+# Прогоны 60 и 425 при 20/300/3 заканчиваются перехватом.
+SCENARIOS = [
+    ((80, 120, 3), "random", "flee", range(8)),
+    ((20, 300, 3), "random", "flee", [*range(8), 60, 425]),
+    ((119, 120, 2), "random", "flee", range(4)),
+    ((20, 300, 3), "random", "zigzag", range(6)),
+    ((20, 300, 3), "pn", "break", range(4)),
+]
+
+
+@pytest.mark.parametrize("params, guidance, evasion, runs", SCENARIOS)
+def test_drive_integrators_agree(params, guidance, evasion, runs):
+    for run_index in runs:
+        results = {integrator: run_engagement(*params, rng=make_rng(7, run_index),
+                                              max_time=MAX_TIME, integrator=integrator,
+                                              guidance=guidance, evasion=evasion)
+                   for integrator in INTEGRATORS}
+        fixed = results["fixed"]
+        for integrator in ("event", "predict"):
+            result = results[integrator]
+            assert result.intercepted == fixed.intercepted, (integrator, run_index)
+            assert result.time == pytest.approx(fixed.time, abs=DT + 1e-6), \
+                (integrator, run_index)
+
+
+def test_drive_rejects_unknown_integrator():
+    with pytest.raises(ValueError):
+        run_engagement(80, 120, 3, rng=make_rng(7, 0), integrator="evnt")
+
+
+@pytest.mark.parametrize("integrator", INTEGRATORS)
+def test_replay_check_round_trip(tmp_path, integrator):
+    path = str(tmp_path / "runs.jsonl")
+    assert replay.main(["search", "--params", "20", "300", "3", "--seed", "7",
+                        "--start", "55", "--runs", "10", "--max-time", str(MAX_TIME),
+                        "--integrator", integrator, "--output", path]) == 0
+    records = replay.load_records(path)
+    assert len(records) == 10
+    assert any(record.result.intercepted for record in records)
+    assert replay.main(["check", path]) == 0
+
+    record = records[0]
+    tampered = record._replace(result=record.result._replace(time=record.result.time + DT))
+    with pytest.raises(replay.ReplayMismatch):
+        replay.replay(tampered)
+
+
+def _chase(speed_drone_kmh, speed_missile_kmh, entry_angle, offset_km):
+    """Пакет из одной строки: ракета в зоне, до смены курса 30 с"""
+    b = BatchEngine(1, speed_drone_kmh, speed_missile_kmh, 3.0,
+                    np.random.default_rng(0), integrator="fixed")
+    heading = 0.7
+    b.interval[:] = 30.0
+    b.angle[:] = heading
+    b.vx[:] = math.cos(heading) * b.speed_missile
+    b.vy[:] = math.sin(heading) * b.speed_missile
+    b.missile_x[:] = b.drone_x - offset_km * math.cos(heading + entry_angle)
+    b.missile_y[:] = b.drone_y - offset_km * math.sin(heading + entry_angle)
+    return b
+
+
+@pytest.mark.parametrize("speeds", [(20, 300), (80, 120), (119, 120), (1, 500)])
+def test_skip_segments_batch_matches_steps(speeds):
+    margin = sum(speeds) / 3600.0 * DT
+    skipped = 0
+    for entry_angle in (0.02, 0.1, 1.0, 2.0, 2.8):
+        for offset_km in (0.5, 1.5, 2.5):
+            skip = _chase(*speeds, entry_angle, offset_km)
+            steps = copy.deepcopy(skip)
+            rows, intercept = skip_segments_batch(skip, np.arange(1))
+            if not len(rows):
+                continue
+            skipped += 1
+            for _ in range(round(skip.clock[0] / DT)):
+                if not steps.step():
+                    break
+            case = (entry_angle, offset_km)
+            if len(intercept):
+                assert steps.intercepted[0], case
+                assert steps.finish_time[0] == pytest.approx(skip.clock[0], abs=DT), case
+            else:
+                assert steps.alive, case
+                assert math.hypot(steps.drone_x[0] - skip.drone_x[0],
+                                  steps.drone_y[0] - skip.drone_y[0]) < margin, case
+                assert math.hypot(steps.missile_x[0] - skip.missile_x[0],
+                                  steps.missile_y[0] - skip.missile_y[0]) < 1e-9, case
+    assert skipped >= 10
+
+
+@pytest.mark.parametrize("miss_km", [0.0, 2.0, 2.9, 3.5])
+def test_leap_stops_before_event(miss_km):
+    """
+    Прыжок вне зоны кончается там же, куда пришли бы шаги "fixed", и не
+    дальше шага перед событием: входом в зону или выходом за границы.
+    """
+    b = BatchEngine(1, 80, 120, 3.0, np.random.default_rng(0), integrator="event")
+    b.interval[:] = 1000.0
+    b.angle[:] = 0.0
+    b.vx[:], b.vy[:] = b.speed_missile, 0.0
+    b.missile_x[:] = b.drone_x - 8.0
+    b.missile_y[:] = b.drone_y + miss_km
+    steps = copy.deepcopy(b)
+    b.leap()
+    n_steps = round(b.clock[0] / DT)
+    assert n_steps > 0
+
+    def in_zone():
+        return steps.drone_vx[0] != 0 or steps.drone_vy[0] != 0
+
+    for _ in range(n_steps):
+        assert steps.step() and not in_zone()
+    assert steps.missile_x[0] == pytest.approx(b.missile_x[0], abs=1e-9)
+    assert steps.missile_y[0] == pytest.approx(b.missile_y[0], abs=1e-9)
+    for _ in range(2):
+        if not steps.step() or in_zone():
+            break
+    else:
+        pytest.fail("событие дальше двух шагов после прыжка")
+    assert steps.alive == (miss_km < 3.0)
+
+
+def _summary(result):
+    finished = ~np.isnan(result.time)
+    return finished.mean(), result.intercepted[finished], result.time[finished]
+
+
+@pytest.mark.parametrize("params", [(20, 300, 3), (20, 100, 1)])
+def test_batch_predict_matches_fixed(params):
+    n = 4000
+    fixed = run_batch(n, *params, rng=np.random.default_rng(5), max_time=MAX_TIME,
+                      integrator="fixed")
+    predict = run_batch(n, *params, rng=np.random.default_rng(6), max_time=MAX_TIME,
+                        integrator="predict")
+    share_a, hits_a, time_a = _summary(fixed)
+    share_b, hits_b, time_b = _summary(predict)
+
+    def close(a, b, se):
+        return abs(a - b) <= 4 * se + 1e-12
+
+    p = (hits_a.sum() + hits_b.sum()) / (len(hits_a) + len(hits_b))
+    assert close(hits_a.mean(), hits_b.mean(),
+                 math.sqrt(p * (1 - p) * (1 / len(hits_a) + 1 / len(hits_b))))
+    q = (share_a + share_b) / 2
+    assert close(share_a, share_b, math.sqrt(q * (1 - q) * 2 / n))
+    assert close(time_a.mean(), time_b.mean(),
+                 math.sqrt(time_a.var() / len(time_a) + time_b.var() / len(time_b)))
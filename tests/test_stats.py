@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from stats import QUANTILES, Distribution, wilson_interval
+
+
+@pytest.mark.parametrize("draw", [
+    lambda rng, n: rng.exponential(300.0, n),
+    lambda rng, n: rng.normal(500.0, 80.0, n),
+])
+def test_distribution_add_array_matches_exact(draw):
+    rng = np.random.default_rng(3)
+    distribution = Distribution()
+    chunks = [draw(rng, 2000) for _ in range(25)]
+    for chunk in chunks:
+        distribution.add_array(chunk)
+    values = np.concatenate(chunks)
+    assert distribution.stats.count == len(values)
+    assert distribution.stats.mean == pytest.approx(values.mean(), rel=1e-9)
+    assert distribution.stats.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+    for p in QUANTILES:
+        assert distribution.quantile(p) == pytest.approx(np.quantile(values, p), rel=0.02)
+
+
+def test_wilson_interval_contains_estimate():
+    lo, hi = wilson_interval(30, 1000)
+    assert 0.0 < lo < 0.03 < hi < 1.0
+    assert wilson_interval(0, 0) == (0.0, 1.0)
@@ -0,0 +1,225 @@
+"""
+Запись траекторий в компактный столбцовый бинарный формат.
+
+Файл: магическая строка, длина заголовка (uint32), заголовок JSON
+(столбцы, размер блока, метаданные прогона), затем блоки. Блок — число
+строк (uint32), 4 байта выравнивания и столбцы подряд как float32
+длиной chunk_rows (у последнего блока — сколько записано). Все блоки,
+кроме последнего, полные, поэтому смещение любого шага вычисляется
+сразу, а файл читается через mmap без загрузки в память.
+
+    python trajectory.py record --params 80 120 3 --seed 1 --run 7 --output run.traj
+    python trajectory.py info run.traj
+    python main.py --play run.traj
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from simulation import DT, Engagement, make_rng
+
+MAGIC = b"BPLATRJ1"
+CHUNK_ROWS = 4096
+
+COLUMNS = [
+    "time", "drone_x", "drone_y", "missile_x", "missile_y", "missile_angle",
+    "drone_distance", "missile_distance", "missile_active", "intercepted",
+]
+
+_CHUNK_HEADER = struct.Struct("<I4x")
+
+
+def engagement_row(engagement):
+    """Состояние взаимодействия в порядке COLUMNS"""
+    d, m = engagement.drone, engagement.missile
+    return (
+        engagement.time_elapsed, d.x, d.y, m.x, m.y, m.angle, d.distance, m.distance,
+        float(m.active), float(engagement.intercepted),
+    )
+
+
+class TrajectoryWriter:
+    """Потоковая запись: строки копятся в буфере одного блока и сбрасываются на диск"""
+
+    def __init__(self, path, metadata=None, columns=COLUMNS, chunk_rows=CHUNK_ROWS):
+        self.columns = list(columns)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.file = open(path, "wb")
+
+        header = json.dumps({
+            "columns": self.columns,
+            "chunk_rows": chunk_rows,
+            "metadata": metadata or {},
+        }, ensure_ascii=False).encode()
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)  # выравнивание блоков
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+        self._buffers = [array("f") for _ in self.columns]
+
+    def append(self, row):
+        for buffer, value in zip(self._buffers, row):
+            buffer.append(value)
+        self.rows += 1
+        if len(self._buffers[0]) >= self.chunk_rows:
+            self.flush()
+
+    def append_engagement(self, engagement):
+        self.append(engagement_row(engagement))
+
+    def flush(self):
+        """Пишет накопленный (возможно неполный) блок"""
+        n = len(self._buffers[0])
+        if not n:
+            return
+        self.file.write(_CHUNK_HEADER.pack(n))
+        for buffer in self._buffers:
+            buffer.tofile(self.file)
+            del buffer[:]
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """Чтение через mmap: доступ к любому шагу без чтения файла целиком"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: не файл траектории")
+
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_len])
+        self.columns = header["columns"]
+        self.chunk_rows = header["chunk_rows"]
+        self.metadata = header["metadata"]
+        self._data_start = start + header_len
+        self._chunk_bytes = _CHUNK_HEADER.size + 4 * len(self.columns) * self.chunk_rows
+
+        # Число строк: полные блоки плюс хвост последнего
+        data_len = len(self._mmap) - self._data_start
+        full, rest = divmod(data_len, self._chunk_bytes)
+        self.rows = full * self.chunk_rows
+        if rest:
+            (tail,) = _CHUNK_HEADER.unpack_from(self._mmap, self._data_start + full * self._chunk_bytes)
+            self.rows += tail
+
+    def __len__(self):
+        return self.rows
+
+    def _locate(self, chunk):
+        """Смещение данных блока и число строк в нём"""
+        offset = self._data_start + chunk * self._chunk_bytes
+        (n,) = _CHUNK_HEADER.unpack_from(self._mmap, offset)
+        return offset + _CHUNK_HEADER.size, n
+
+    def row(self, index):
+        """Строка index как словарь столбец → значение"""
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        chunk, pos = divmod(index, self.chunk_rows)
+        offset, n = self._locate(chunk)
+        return {
+            name: struct.unpack_from("<f", self._mmap, offset + 4 * (col * n + pos))[0]
+            for col, name in enumerate(self.columns)
+        }
+
+    def column(self, name):
+        """Столбец целиком как массив NumPy (блоки — представления mmap)"""
+        import numpy as np
+
+        col = self.columns.index(name)
+        parts = []
+        for chunk in range((self.rows + self.chunk_rows - 1) // self.chunk_rows):
+            offset, n = self._locate(chunk)
+            parts.append(np.frombuffer(self._mmap, dtype="<f4", count=n,
+                                       offset=offset + 4 * col * n))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0, dtype="<f4")
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_numpy(path):
+    """Все столбцы файла как словарь имя → массив NumPy"""
+    reader = TrajectoryReader(path)
+    return {name: reader.column(name) for name in reader.columns}
+
+
+def record_engagement(path, engagement, dt=DT, max_time=None, metadata=None):
+    """Прогоняет взаимодействие фиксированным шагом и пишет каждый шаг в файл"""
+    meta = {
+        "speed_drone_kmh": engagement.speed_drone_kmh,
+        "speed_missile_kmh": engagement.speed_missile_kmh,
+        "zone_radius_km": engagement.zone_radius_km,
+        "dt": dt,
+    }
+    meta.update(metadata or {})
+    with TrajectoryWriter(path, meta) as writer:
+        engagement.launch()
+        writer.append_engagement(engagement)
+        while not engagement.step(dt):
+            writer.append_engagement(engagement)
+            if max_time is not None and engagement.time_elapsed >= max_time:
+                break
+        else:
+            writer.append_engagement(engagement)
+    return engagement.result()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и просмотр траекторий")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="записать прогон по зерну")
+    record.add_argument("--params", nargs=3, type=float, required=True,
+                        metavar=("DRONE_KMH", "MISSILE_KMH", "ZONE_KM"))
+    record.add_argument("--seed", type=int, default=0, help="главное зерно")
+    record.add_argument("--run", type=int, default=0, help="номер прогона")
+    record.add_argument("--max-time", type=float, default=None)
+    record.add_argument("--output", required=True)
+
+    info = commands.add_parser("info", help="сведения о файле")
+    info.add_argument("path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "record":
+        engagement = Engagement(*args.params, make_rng(args.seed, args.run))
+        result = record_engagement(args.output, engagement, max_time=args.max_time,
+                                   metadata={"master_seed": args.seed, "run_index": args.run})
+        print(f"{args.output}: {result}")
+        return 0
+
+    with TrajectoryReader(args.path) as reader:
+        print(f"Шагов: {len(reader)}, столбцы: {', '.join(reader.columns)}")
+        print(f"Метаданные: {reader.metadata}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())